@@ -0,0 +1,193 @@
+from functools import partial
+from time import monotonic, sleep
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router, transaction
+
+from foods.models import Favorite, Recipe, ShoppingList
+from users.following import followed_author_ids
+from .serializers import RecipeSerializer, UserRetrieveListSerializer
+
+DOCUMENT_KEY = 'api:recipe-document:{}'
+LOCK_KEY = 'api:recipe-document:{}:lock'
+LOCK_TIMEOUT = 10
+LOCK_POLL_INTERVAL = 0.05
+
+
+class AuthorDocumentSerializer(UserRetrieveListSerializer):
+    is_subscribed = None
+
+    class Meta(UserRetrieveListSerializer.Meta):
+        fields = ('email', 'id', 'username', 'first_name', 'last_name')
+
+
+class RecipeDocumentSerializer(RecipeSerializer):
+    """Viewer-independent part of ``RecipeSerializer`` output."""
+
+    author = AuthorDocumentSerializer()
+    is_favorited = None
+    is_in_shopping_cart = None
+
+    class Meta(RecipeSerializer.Meta):
+        fields = (
+            'id', 'tags', 'author',
+            'ingredients', 'name',
+            'image', 'text', 'cooking_time'
+        )
+
+
+def _build_documents(recipe_ids) -> dict:
+    # Cached documents outlive the request, so never build them from a
+    # possibly lagging replica.
+    recipes = Recipe.objects.using(
+        router.db_for_write(Recipe)
+    ).filter(id__in=recipe_ids).select_related(
+        'author'
+    ).prefetch_related('tags', 'recipe_ingredients')
+    return {
+        recipe.id: RecipeDocumentSerializer(recipe).data
+        for recipe in recipes
+    }
+
+
+def _acquire(recipe_id, wait: float) -> bool:
+    deadline = monotonic() + wait
+    while not cache.add(LOCK_KEY.format(recipe_id), 1, LOCK_TIMEOUT):
+        if monotonic() >= deadline:
+            return False
+        sleep(LOCK_POLL_INTERVAL)
+    return True
+
+
+def _release(recipe_ids) -> None:
+    cache.delete_many([LOCK_KEY.format(pk) for pk in recipe_ids])
+
+
+def _store(documents: dict) -> None:
+    cache.set_many(
+        {DOCUMENT_KEY.format(pk): doc for pk, doc in documents.items()},
+        settings.RECIPE_DOCUMENT_TIMEOUT
+    )
+
+
+def _wait_for(recipe_ids) -> dict:
+    keys = {DOCUMENT_KEY.format(pk): pk for pk in recipe_ids}
+    deadline = monotonic() + LOCK_TIMEOUT
+    found: dict = {}
+    while keys and monotonic() < deadline:
+        sleep(LOCK_POLL_INTERVAL)
+        for key, doc in cache.get_many(list(keys)).items():
+            found[keys.pop(key)] = doc
+        if not any(cache.get_many(
+            [LOCK_KEY.format(pk) for pk in keys.values()]
+        )):
+            break
+    return found
+
+
+def _rebuild_missing(recipe_ids) -> dict:
+    """Build missing documents, collapsing concurrent rebuilds.
+
+    Only the caller holding a recipe's lock queries the database for
+    it; everybody else waits for the document to appear in the cache.
+    """
+    owned = [pk for pk in recipe_ids if _acquire(pk, wait=0)]
+    documents: dict = {}
+    if owned:
+        try:
+            documents = _build_documents(owned)
+            _store(documents)
+        finally:
+            _release(owned)
+    others = [pk for pk in recipe_ids if pk not in owned]
+    if others:
+        documents.update(_wait_for(others))
+        late = [pk for pk in others if pk not in documents]
+        if late:
+            documents.update(_build_documents(late))
+    return documents
+
+
+def get_documents(recipe_ids) -> dict:
+    if not settings.SHARED_CACHE:
+        return _build_documents(recipe_ids)
+    keys = {DOCUMENT_KEY.format(pk): pk for pk in recipe_ids}
+    documents = {
+        keys[key]: doc for key, doc in cache.get_many(list(keys)).items()
+    }
+    missing = [pk for pk in recipe_ids if pk not in documents]
+    if missing:
+        documents.update(_rebuild_missing(missing))
+    return documents
+
+
+def refresh_documents(recipe_ids) -> None:
+    """Rebuild documents after a write, ordered after running rebuilds."""
+    if not settings.SHARED_CACHE:
+        return
+    owned = [pk for pk in recipe_ids if _acquire(pk, wait=LOCK_TIMEOUT)]
+    try:
+        documents = _build_documents(owned)
+        _store(documents)
+        cache.delete_many([
+            DOCUMENT_KEY.format(pk) for pk in owned if pk not in documents
+        ])
+    finally:
+        _release(owned)
+    cache.delete_many([
+        DOCUMENT_KEY.format(pk) for pk in recipe_ids if pk not in owned
+    ])
+
+
+def schedule_refresh(recipe_ids) -> None:
+    transaction.on_commit(partial(refresh_documents, list(recipe_ids)))
+
+
+def invalidate_documents(recipe_ids) -> None:
+    keys = [DOCUMENT_KEY.format(pk) for pk in recipe_ids]
+    if keys:
+        transaction.on_commit(partial(cache.delete_many, keys))
+
+
+def _user_flags(user, recipe_ids, author_ids):
+    if not user.is_authenticated or not recipe_ids:
+        return set(), set(), set()
+    favorited = Favorite.objects.filter(
+        author=user, recipe_id__in=recipe_ids
+    ).values_list('recipe_id', flat=True)
+    in_cart = ShoppingList.objects.filter(
+        author=user, recipe_id__in=recipe_ids
+    ).values_list('recipe_id', flat=True)
+    subscribed = followed_author_ids(user) & author_ids
+    return set(favorited), set(in_cart), subscribed
+
+
+def render_recipes(recipe_ids, request) -> list:
+    """Return ``RecipeSerializer``-shaped data for ids, in order."""
+    documents = get_documents(recipe_ids)
+    recipe_ids = [pk for pk in recipe_ids if pk in documents]
+    favorited, in_cart, subscribed = _user_flags(
+        request.user, recipe_ids,
+        {documents[pk]['author']['id'] for pk in recipe_ids}
+    )
+    results: list = []
+    for pk in recipe_ids:
+        document = documents[pk]
+        image = document['image']
+        results.append({
+            'id': document['id'],
+            'tags': document['tags'],
+            'author': {
+                **document['author'],
+                'is_subscribed': document['author']['id'] in subscribed
+            },
+            'ingredients': document['ingredients'],
+            'is_favorited': pk in favorited,
+            'is_in_shopping_cart': pk in in_cart,
+            'name': document['name'],
+            'image': request.build_absolute_uri(image) if image else None,
+            'text': document['text'],
+            'cooking_time': document['cooking_time'],
+        })
+    return results
@@ -0,0 +1,291 @@
+"""Weighted load scenarios replayed from the Postman collection.
+
+Requests are taken from the collection by name and rendered with
+``{{variables}}`` from a per virtual user context. The collection's
+JavaScript tests are replaced by ``EXTRACT``, which copies ids and
+tokens from responses into that context.
+"""
+import json
+import re
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from random import Random
+from statistics import quantiles
+from threading import Event, Lock
+from time import monotonic, perf_counter
+from uuid import uuid4
+
+import requests
+
+VARIABLE = re.compile(r'\{\{(\w+)\}\}')
+
+# Request names of the collection, run in order by a virtual user.
+SCENARIOS = {
+    'browse': (50, (
+        'get_tag_list // No Auth',
+        'get_recipes_list // No Auth',
+        'get_recipe_detail // No Auth',
+        'get_ingredients_list_with_name_filter // User',
+    )),
+    'member': (30, (
+        'get_recipes_list // User',
+        'get_recipe_detail // User',
+        'add_to_favorite // User',
+        'get_recipes_list_with_is_favorited_param // User',
+        'remove_from_favorite // User',
+        'add_to_shopping_cart // User',
+        'download_shopping_cart // User',
+        'remove_from_shopping_cart // User',
+    )),
+    'social': (15, (
+        'get_user_list// User',
+        'create_subscription_with_recipes_limit_param // User',
+        'get_subscription_list // User',
+        'delete_second_subscription // User',
+    )),
+    'author': (5, (
+        'create_fifth_recipe // User',
+        'get_recipe_detail // User',
+        'delete_fifth_recipe // Second User',
+    )),
+}
+
+EXTRACT = {
+    'create_first_user': lambda data: {'userId': data['id']},
+    'get_token_for_first_user': lambda data: {'userToken': data['auth_token']},
+    'create_second_user': lambda data: {'secondUserId': data['id']},
+    'get_token_for_second_user': lambda data: {
+        'secondUserToken': data['auth_token']
+    },
+    'create_first_recipe // Second User': lambda data: {
+        'firstRecipeId': data['id']
+    },
+    'create_fifth_recipe // User': lambda data: {'fifthRecipeId': data['id']},
+}
+
+
+def load_collection(path) -> tuple:
+    """Map request names to templates, resolving inherited auth."""
+    with open(path, encoding='utf-8') as file:
+        collection = json.load(file)
+    templates: dict = {}
+
+    def walk(items, auth):
+        for item in items:
+            if 'item' in item:
+                walk(item['item'], item.get('auth', auth))
+                continue
+            request = item['request']
+            token = None
+            request_auth = request.get('auth', auth) or {}
+            if request_auth.get('type') == 'apikey':
+                token = {
+                    entry['key']: entry['value']
+                    for entry in request_auth['apikey']
+                }['value']
+            url = request['url']
+            templates.setdefault(item['name'], {
+                'method': request['method'],
+                'url': url['raw'] if isinstance(url, dict) else url,
+                'body': request.get('body', {}).get('raw') or None,
+                'authorization': token,
+            })
+
+    walk(collection['item'], collection.get('auth'))
+    defaults = {
+        variable['key']: variable['value']
+        for variable in collection.get('variable', ())
+    }
+    return templates, defaults
+
+
+def render(template: str, context: dict) -> str:
+    return VARIABLE.sub(lambda match: str(context[match[1]]), template)
+
+
+class Stats:
+    def __init__(self):
+        self._lock = Lock()
+        self.timings = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.errors = Counter()
+
+    def record(self, label, status, elapsed, failed) -> None:
+        with self._lock:
+            self.timings[label].append(elapsed * 1000)
+            self.statuses[label][str(status)] += 1
+            self.errors[label] += failed
+
+    @staticmethod
+    def _summary(timings, errors, statuses, seconds) -> dict:
+        timings = sorted(timings)
+        cuts = (quantiles(timings, n=100, method='inclusive')
+                if len(timings) > 1 else timings * 99)
+        return {
+            'requests': len(timings),
+            'errors': errors,
+            'error_rate': round(errors / len(timings), 4),
+            'throughput': round(len(timings) / seconds, 2),
+            'p50_ms': round(cuts[49], 2),
+            'p95_ms': round(cuts[94], 2),
+            'p99_ms': round(cuts[98], 2),
+            'max_ms': round(timings[-1], 2),
+            'statuses': dict(statuses),
+        }
+
+    def report(self, seconds) -> dict:
+        endpoints = {
+            label: self._summary(
+                timings, self.errors[label], self.statuses[label], seconds
+            )
+            for label, timings in sorted(self.timings.items())
+        }
+        statuses = sum(self.statuses.values(), Counter())
+        total = self._summary(
+            [value for values in self.timings.values() for value in values],
+            sum(self.errors.values()), statuses, seconds
+        ) if self.timings else {}
+        return {'endpoints': endpoints, 'total': total}
+
+
+class LoadTest:
+    def __init__(self, collection, base_url, users, duration,
+                 recipes=10, seed=None):
+        self.templates, self.defaults = load_collection(collection)
+        self.base_url = base_url.rstrip('/')
+        self.users = users
+        self.duration = duration
+        self.recipes = recipes
+        self.random = Random(seed)
+        self.run_id = uuid4().hex[:8]
+        self.stats = Stats()
+        self.shared: dict = {}
+        missing = {
+            step for _, steps in SCENARIOS.values() for step in steps
+        } - self.templates.keys()
+        if missing:
+            raise ValueError(
+                f'Not in the collection: {", ".join(sorted(missing))}'
+            )
+
+    def _send(self, session, name, context, record=True):
+        template = self.templates[name]
+        url = render(template['url'], {**context, 'baseUrl': self.base_url})
+        headers = {}
+        if template['authorization']:
+            headers['Authorization'] = render(
+                template['authorization'], context
+            )
+        body = template['body'] and render(template['body'], context)
+        if body:
+            headers['Content-Type'] = 'application/json'
+        label = f"{template['method']} {template['url']}".replace(
+            '{{baseUrl}}', ''
+        )
+        started = perf_counter()
+        try:
+            response = session.request(
+                template['method'], url, data=body and body.encode(),
+                headers=headers, timeout=30
+            )
+        except requests.RequestException as error:
+            if record:
+                self.stats.record(
+                    label, type(error).__name__, perf_counter() - started,
+                    True
+                )
+            return None
+        if record:
+            self.stats.record(
+                label, response.status_code, perf_counter() - started,
+                response.status_code >= 400
+            )
+        if response.ok and name in EXTRACT:
+            context.update(EXTRACT[name](response.json()))
+        return response
+
+    def _account(self, session, context, number) -> None:
+        name = f'loadtest-{self.run_id}-{number}'
+        context.update({
+            'email': json.dumps(f'{name}@example.com'),
+            'username': json.dumps(name),
+        })
+        self._send(session, 'create_first_user', context)
+        self._send(session, 'get_token_for_first_user', context)
+
+    def setup(self) -> None:
+        """Create the author every scenario reads and follows."""
+        session = requests.Session()
+        context = {**self.defaults}
+        tags = session.get(f'{self.base_url}/api/tags/', timeout=30).json()
+        ingredients = session.get(
+            f'{self.base_url}/api/ingredients/', timeout=30
+        ).json()
+        if len(tags) < 3 or len(ingredients) < 2:
+            raise RuntimeError(
+                'The server needs at least 3 tags and 2 ingredients'
+            )
+        for number, tag in zip(('first', 'second', 'third'), tags):
+            context[f'{number}TagId'] = tag['id']
+            context[f'{number}TagSlug'] = tag['slug']
+        context['firstIndredientId'] = ingredients[0]['id']
+        context['secondIndredientId'] = ingredients[1]['id']
+        context['ingredientNameFirstLatter'] = ingredients[0]['name'][:1]
+        author = f'loadtest-{self.run_id}-author'
+        context['secondUserEmail'] = json.dumps(f'{author}@example.com')
+        context['secondUserUsername'] = json.dumps(author)
+        for name in ('create_second_user', 'get_token_for_second_user'):
+            if self._send(session, name, context, record=False) is None:
+                raise RuntimeError(f'{name} failed during setup')
+        recipe_ids = []
+        for _ in range(self.recipes):
+            self._send(
+                session, 'create_first_recipe // Second User', context,
+                record=False
+            )
+            recipe_ids.append(context['firstRecipeId'])
+        self.shared = {**context, 'recipeIds': recipe_ids}
+
+    def _virtual_user(self, number, stop) -> None:
+        session = requests.Session()
+        context = {**self.shared}
+        self._account(session, context, number)
+        if 'userToken' not in context:
+            return
+        random = Random(self.random.random())
+        names = list(SCENARIOS)
+        weights = [SCENARIOS[name][0] for name in names]
+        while not stop.is_set():
+            scenario = random.choices(names, weights)[0]
+            context['firstRecipeId'] = random.choice(
+                self.shared['recipeIds']
+            )
+            for step in SCENARIOS[scenario][1]:
+                if stop.is_set():
+                    break
+                self._send(session, step, context)
+
+    def run(self) -> dict:
+        self.setup()
+        stop = Event()
+        started = monotonic()
+        with ThreadPoolExecutor(max_workers=self.users) as pool:
+            futures = [
+                pool.submit(self._virtual_user, number, stop)
+                for number in range(self.users)
+            ]
+            stop.wait(self.duration)
+            stop.set()
+            for future in futures:
+                future.result()
+        elapsed = monotonic() - started
+        return {
+            'run_id': self.run_id,
+            'base_url': self.base_url,
+            'users': self.users,
+            'duration': round(elapsed, 2),
+            'scenarios': {
+                name: weight for name, (weight, _) in SCENARIOS.items()
+            },
+            **self.stats.report(elapsed),
+        }
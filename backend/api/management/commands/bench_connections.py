@@ -0,0 +1,53 @@
+from statistics import mean, quantiles
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from django.test import Client, override_settings
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare endpoint latency with a new database connection per '
+        'request against the configured persistent connections'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/api/tags/')
+        parser.add_argument('--requests', type=int, default=200)
+
+    def _measure(self, client, path, requests) -> list:
+        timings = []
+        for _ in range(requests):
+            started = perf_counter()
+            client.get(path)
+            # The test client skips the request_finished hook that
+            # applies CONN_MAX_AGE, so run it like a real worker would.
+            close_old_connections()
+            timings.append((perf_counter() - started) * 1000)
+        return timings
+
+    def _report(self, label, timings) -> None:
+        cuts = quantiles(timings, n=100)
+        self.stdout.write(
+            f'{label:<28} mean {mean(timings):7.2f} ms  '
+            f'p50 {cuts[49]:7.2f} ms  p95 {cuts[94]:7.2f} ms'
+        )
+
+    def handle(self, *args, **options):
+        path, requests = options['path'], options['requests']
+        configured = connection.settings_dict['CONN_MAX_AGE']
+        client = Client()
+        with override_settings(ALLOWED_HOSTS=['*']):
+            client.get(path)
+            try:
+                connection.settings_dict['CONN_MAX_AGE'] = 0
+                connection.close()
+                fresh = self._measure(client, path, requests)
+            finally:
+                connection.settings_dict['CONN_MAX_AGE'] = configured
+            connection.close()
+            reused = self._measure(client, path, requests)
+        self.stdout.write(f'{requests} x GET {path} ({connection.vendor})')
+        self._report('new connection per request', fresh)
+        self._report(f'CONN_MAX_AGE={configured}', reused)
@@ -0,0 +1,107 @@
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from foods.deletion import delete_users
+from foods.models import (
+    Favorite, Ingredient, Recipe, RecipeIngredient, ShoppingList, Tag
+)
+from users.models import Follow
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare deleting a prolific user through the ORM collector '
+        'against the set-based delete path'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipes', type=int, default=10000)
+        parser.add_argument('--ingredients', type=int, default=5)
+        parser.add_argument('--followers', type=int, default=100)
+
+    def _create_user(self, username):
+        return User.objects.create_user(
+            f'{username}@example.com', username, 'Bench', 'User', None
+        )
+
+    @transaction.atomic
+    def _populate(self, label, options):
+        author = self._create_user(f'bench-delete-{label}')
+        fan = self._create_user(f'bench-delete-{label}-fan')
+        followers = User.objects.bulk_create(
+            User(
+                email=f'bench-delete-{label}-{i}@example.com',
+                username=f'bench-delete-{label}-{i}',
+                first_name='Bench', last_name='Follower'
+            )
+            for i in range(options['followers'])
+        )
+        Follow.objects.bulk_create(
+            Follow(user=follower, author=author)
+            for follower in [fan, *followers]
+        )
+        tag = Tag.objects.get_or_create(
+            slug='bench-delete',
+            defaults={'name': 'bench-delete', 'color': '#000000'}
+        )[0]
+        ingredients = [
+            Ingredient.objects.get_or_create(
+                name=f'bench-delete-{i}', measurement_unit='г'
+            )[0]
+            for i in range(options['ingredients'])
+        ]
+        recipes = Recipe.objects.bulk_create((
+            Recipe(
+                author=author, name=f'bench {i}', text='bench',
+                cooking_time=1, image=''
+            )
+            for i in range(options['recipes'])
+        ), batch_size=1000)
+        RecipeIngredient.objects.bulk_create((
+            RecipeIngredient(recipe=recipe, ingredient=ingredient, amount=1)
+            for recipe in recipes for ingredient in ingredients
+        ), batch_size=1000)
+        Recipe.tags.through.objects.bulk_create((
+            Recipe.tags.through(recipe=recipe, tag=tag)
+            for recipe in recipes
+        ), batch_size=1000)
+        for model in (Favorite, ShoppingList):
+            model.objects.bulk_create((
+                model(author=fan, recipe=recipe) for recipe in recipes
+            ), batch_size=1000)
+        return author, fan, followers
+
+    def _measure(self, label, delete, options):
+        author, fan, followers = self._populate(label, options)
+        queries = []
+
+        def count(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count):
+            started = perf_counter()
+            total, _ = delete(author)
+            elapsed = perf_counter() - started
+        self.stdout.write(
+            f'{label:<10} {elapsed * 1000:10.1f} ms  '
+            f'{len(queries):6} queries  {total} rows'
+        )
+        User.objects.filter(
+            id__in=[fan.id, *(follower.id for follower in followers)]
+        ).delete()
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f'Deleting a user with {options["recipes"]} recipes '
+            f'({connection.vendor})'
+        )
+        self._measure('collector', lambda user: user.delete(), options)
+        self._measure('set-based', lambda user: delete_users(
+            User.objects.filter(pk=user.pk)
+        ), options)
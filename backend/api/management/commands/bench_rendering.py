@@ -0,0 +1,80 @@
+import json
+from statistics import mean, quantiles
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+
+from api.rendering import DATABASE, ORM
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare recipe list latency of ORM and database-side JSON '
+        'rendering and check both return the same data'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/api/recipes/?limit=50')
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument(
+            '--username', help='Request as this user (anonymous otherwise)'
+        )
+
+    def _get(self, client, path, mode):
+        with override_settings(RECIPE_RENDERING={
+            'recipes-list': mode, 'recipes-detail': mode
+        }):
+            return client.get(path)
+
+    def _measure(self, client, path, mode, requests) -> list:
+        timings = []
+        for _ in range(requests):
+            started = perf_counter()
+            self._get(client, path, mode)
+            timings.append((perf_counter() - started) * 1000)
+        return timings
+
+    def _report(self, label, timings) -> None:
+        cuts = quantiles(timings, n=100)
+        self.stdout.write(
+            f'{label:<10} mean {mean(timings):7.2f} ms  '
+            f'p50 {cuts[49]:7.2f} ms  p95 {cuts[94]:7.2f} ms'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Database rendering needs PostgreSQL')
+        path, requests = options['path'], options['requests']
+        client = Client()
+        if options['username']:
+            client.force_login(User.objects.get(
+                username=options['username']
+            ))
+        with override_settings(ALLOWED_HOSTS=['*']):
+            # The first requests also warm the recipe document cache.
+            responses = {
+                mode: self._get(client, path, mode) for mode in (ORM, DATABASE)
+            }
+            for mode, response in responses.items():
+                if response.status_code != 200:
+                    raise CommandError(
+                        f'{mode}: {response.status_code} for {path}'
+                    )
+            if (json.loads(responses[ORM].content)
+                    != json.loads(responses[DATABASE].content)):
+                raise CommandError('The renderings return different data')
+            timings = {
+                mode: self._measure(client, path, mode, requests)
+                for mode in (ORM, DATABASE)
+            }
+        self.stdout.write(
+            f'{requests} x GET {path}, identical output, '
+            f'{len(responses[DATABASE].content)} bytes'
+        )
+        for mode, values in timings.items():
+            self._report(mode, values)
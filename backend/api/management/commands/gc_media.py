@@ -0,0 +1,58 @@
+import os
+from datetime import timedelta
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from foods.models import Recipe
+from foods.storage import delete_unreferenced, recipe_image_storage
+
+
+class Command(BaseCommand):
+    help = 'Delete recipe images that no recipe references any more'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--min-age', type=int, default=24 * 60 * 60,
+            help='Keep files younger than this many seconds; an upload '
+                 'is written before its recipe row is committed.'
+        )
+        parser.add_argument('--dry-run', action='store_true')
+
+    def _files(self, storage, root, cutoff):
+        base = storage.path(root)
+        for directory, _, files in os.walk(base):
+            for filename in files:
+                path = os.path.join(directory, filename)
+                if os.path.getmtime(path) >= cutoff:
+                    continue
+                yield os.path.relpath(
+                    path, storage.location
+                ).replace(os.sep, '/')
+
+    def handle(self, *args, **options):
+        storage = recipe_image_storage()
+        root = Recipe._meta.get_field('image').upload_to
+        cutoff = (
+            timezone.now() - timedelta(seconds=options['min_age'])
+        ).timestamp()
+        files = self._files(storage, root, cutoff)
+        scanned = deleted = 0
+        while batch := list(islice(files, options['batch_size'])):
+            scanned += len(batch)
+            if options['dry_run']:
+                referenced = set(Recipe.objects.filter(
+                    image__in=batch
+                ).values_list('image', flat=True))
+                orphans = [name for name in batch if name not in referenced]
+                for name in orphans:
+                    self.stdout.write(name)
+                deleted += len(orphans)
+            else:
+                deleted += len(delete_unreferenced(batch))
+        verb = 'would delete' if options['dry_run'] else 'deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f'Scanned {scanned} file(s), {verb} {deleted} orphan(s)'
+        ))
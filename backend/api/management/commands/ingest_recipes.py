@@ -0,0 +1,56 @@
+import json
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from foods.ingest import INGEST_BATCH_SIZE, ingest
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Create recipes from an NDJSON file, one recipe per line'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='NDJSON file, "-" for stdin.')
+        parser.add_argument(
+            '--author', required=True, help='Username of the recipe author.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=INGEST_BATCH_SIZE
+        )
+        parser.add_argument(
+            '--report', help='Write the per-row report to this NDJSON file.'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            author = User.objects.get(username=options['author'])
+        except User.DoesNotExist:
+            raise CommandError(f'No user {options["author"]}')
+        source = (sys.stdin.buffer if options['path'] == '-'
+                  else open(options['path'], 'rb'))
+        report = (open(options['report'], 'w', encoding='utf-8')
+                  if options['report'] else None)
+        created = failed = 0
+        try:
+            for row in ingest(author, source, options['batch_size']):
+                if row['status'] == 'created':
+                    created += 1
+                else:
+                    failed += 1
+                    self.stderr.write(
+                        f'line {row["line"]}: '
+                        + json.dumps(row['errors'], ensure_ascii=False)
+                    )
+                if report:
+                    report.write(json.dumps(row, ensure_ascii=False) + '\n')
+        finally:
+            if source is not sys.stdin.buffer:
+                source.close()
+            if report:
+                report.close()
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {created} recipes, {failed} rows failed'
+        ))
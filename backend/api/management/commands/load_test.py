@@ -0,0 +1,80 @@
+import json
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.loadtest import LoadTest
+
+COLUMNS = ('requests', 'error_rate', 'throughput', 'p50_ms', 'p95_ms', 'p99_ms')
+
+
+class Command(BaseCommand):
+    help = (
+        'Replay weighted scenarios from the Postman collection against a '
+        'running server and report latency percentiles per endpoint'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--duration', type=float, default=30)
+        parser.add_argument(
+            '--recipes', type=int, default=10,
+            help='Recipes created for the scenarios to read.'
+        )
+        parser.add_argument('--seed', type=int)
+        parser.add_argument(
+            '--collection',
+            default=settings.BASE_DIR / 'postman-collection'
+            / 'diploma.postman_collection.json'
+        )
+        parser.add_argument(
+            '--output', default=settings.BASE_DIR / 'loadtest-results'
+        )
+        parser.add_argument(
+            '--compare', help='A saved result to print the changes against.'
+        )
+
+    def _table(self, report, baseline) -> None:
+        self.stdout.write(
+            f'{"endpoint":<58}' + ''.join(f'{c:>12}' for c in COLUMNS)
+        )
+        rows = [*report['endpoints'].items(), ('TOTAL', report['total'])]
+        previous = {
+            **baseline.get('endpoints', {}), 'TOTAL': baseline.get('total')
+        } if baseline else {}
+        for label, stats in rows:
+            self.stdout.write(
+                f'{label[:57]:<58}'
+                + ''.join(f'{stats[c]:>12}' for c in COLUMNS)
+            )
+            before = previous.get(label)
+            if before:
+                self.stdout.write(f'{"  vs baseline":<58}' + ''.join(
+                    f'{stats[c] - before[c]:>+12.2f}' for c in COLUMNS
+                ))
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as file:
+                baseline = json.load(file)
+        try:
+            load_test = LoadTest(
+                options['collection'], options['base_url'],
+                options['users'], options['duration'],
+                recipes=options['recipes'], seed=options['seed']
+            )
+            report = load_test.run()
+        except (RuntimeError, ValueError) as error:
+            raise CommandError(error)
+        if not report['total']:
+            raise CommandError('No requests were made')
+        self._table(report, baseline)
+        output = Path(options['output'])
+        output.mkdir(parents=True, exist_ok=True)
+        path = output / f'{datetime.now():%Y%m%dT%H%M%S}-{report["run_id"]}.json'
+        path.write_text(json.dumps(report, ensure_ascii=False, indent=2))
+        self.stdout.write(self.style.SUCCESS(f'Saved {path}'))
@@ -1,14 +1,10 @@
 import os
-import django
 import csv
 from django.core.management.base import BaseCommand
 from django.conf import settings
 
 from foods.models import Ingredient
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'foodgram.settings')
-django.setup()
-
 
 class Command(BaseCommand):
     help = 'Parse and import CSV data'
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from foods.models import Ingredient
+from foods.usage import recount_ingredient_usage
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute ingredient usage counts from recipes, correcting any '
+        'drift of the incrementally maintained values'
+    )
+
+    def handle(self, *args, **options):
+        updated = recount_ingredient_usage(Ingredient.objects.all())
+        self.stdout.write(self.style.SUCCESS(
+            f'Recounted usage of {updated} ingredients'
+        ))
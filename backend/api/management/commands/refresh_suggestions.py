@@ -0,0 +1,31 @@
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+
+from users.models import Follow, FollowSuggestion
+from users.suggestions import refresh_suggestions
+
+
+class Command(BaseCommand):
+    help = 'Recompute "people to follow" suggestions for every user'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        # Users without follows get no suggestions, but may still have
+        # rows left over from follows they have since removed.
+        user_ids = iter(sorted(
+            set(Follow.objects.values_list('user_id', flat=True).distinct())
+            | set(FollowSuggestion.objects.values_list(
+                'user_id', flat=True
+            ).distinct())
+        ))
+        users = rows = 0
+        while batch := list(islice(user_ids, options['batch_size'])):
+            rows += refresh_suggestions(batch)
+            users += len(batch)
+            self.stdout.write(f'{users} users, {rows} suggestions')
+        self.stdout.write(self.style.SUCCESS(
+            f'Refreshed suggestions for {users} users'
+        ))
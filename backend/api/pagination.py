@@ -1,6 +1,29 @@
-from rest_framework.pagination import PageNumberPagination
+from django.conf import settings
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 
 
 class CustomPagination(PageNumberPagination):
     page_size_query_param = 'limit'
     page_size = 6
+    max_page_size = settings.MAX_PAGE_SIZE
+
+    def get_page_number(self, request, paginator):
+        page_number = super().get_page_number(request, paginator)
+        # Deep OFFSETs scan and discard every row before the page.
+        if (str(page_number).isdigit() and (int(page_number) - 1)
+                * paginator.per_page >= settings.MAX_PAGE_OFFSET):
+            raise ValidationError({self.page_query_param: [
+                f'Only the first {settings.MAX_PAGE_OFFSET} results can '
+                'be paged through, use filters to narrow them down'
+            ]})
+        return page_number
+
+
+class NotificationPagination(CursorPagination):
+    """Keyset pages over ``notification_inbox_idx``, no ``COUNT(*)``."""
+
+    ordering = '-id'
+    page_size_query_param = 'limit'
+    page_size = 20
+    max_page_size = settings.MAX_PAGE_SIZE
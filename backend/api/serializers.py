@@ -1,16 +1,23 @@
 import base64
 
-from django.shortcuts import get_object_or_404
 from django.core.files.base import ContentFile
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 from rest_framework import status
+from rest_framework.settings import api_settings
 from djoser import serializers as djoser_serializers
 
 from foods.models import (
     Recipe, Tag,
     Ingredient, RecipeIngredient
 )
+from foods.reference import ingredient_references, tag_references
+from foods.usage import record_ingredient_usage
+from users.following import (
+    followed_author_ids, invalidate_followed_author_ids
+)
+from users.models import Follow, Notification
+from users.tasks import schedule_suggestions_refresh
 from django.conf import settings
 
 
@@ -38,12 +45,21 @@ class UserRetrieveListSerializer(serializers.ModelSerializer):
         )
 
     def get_is_subscribed(self, obj):
-        if (self.context['request'].user.is_authenticated
-            and obj.subscribing.filter(
-                user=self.context['request'].user
-        ).exists()):
-            return True
-        return False
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
+        # Looked up once per serialization, not once per row.
+        followed = self.context.get('followed_author_ids')
+        if followed is None:
+            followed = followed_author_ids(self.context['request'].user)
+            self.context['followed_author_ids'] = followed
+        return obj.id in followed
+
+
+class SuggestedAuthorSerializer(UserRetrieveListSerializer):
+    mutual_follows = serializers.IntegerField(read_only=True)
+
+    class Meta(UserRetrieveListSerializer.Meta):
+        fields = UserRetrieveListSerializer.Meta.fields + ('mutual_follows',)
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -59,16 +75,37 @@ class IngredientSerializer(serializers.ModelSerializer):
 
 
 class RecipeIngredientSerializer(serializers.ModelSerializer):
-    id = serializers.ReadOnlyField(source='ingredient.id')
-    name = serializers.ReadOnlyField(source='ingredient.name')
-    measurement_unit = serializers.ReadOnlyField(
-        source='ingredient.measurement_unit'
-    )
+    id = serializers.ReadOnlyField(source='ingredient_id')
+    name = serializers.SerializerMethodField()
+    measurement_unit = serializers.SerializerMethodField()
 
     class Meta:
         model = RecipeIngredient
         fields = ('id', 'name', 'measurement_unit', 'amount')
 
+    def _ingredient(self, obj):
+        return (ingredient_references.get(obj.ingredient_id)
+                or obj.ingredient)
+
+    def get_name(self, obj):
+        return self._ingredient(obj).name
+
+    def get_measurement_unit(self, obj):
+        return self._ingredient(obj).measurement_unit
+
+
+class CachedTagField(serializers.PrimaryKeyRelatedField):
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            tag = tag_references.get(int(data))
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if tag is None:
+            self.fail('does_not_exist', pk_value=data)
+        return tag
+
 
 class CreateIngredientAmountSerializer(
     serializers.ModelSerializer
@@ -89,7 +126,7 @@ class Base64ImageField(serializers.ImageField):
         if isinstance(data, str) and data.startswith('data:image'):
             format, imgstr = data.split(';base64,')
             ext = format.split('/')[-1]
-            data = ContentFile(base64.b64decode(imgstr), name='temp.' + ext)
+            data = ContentFile(base64.b64decode(imgstr), name='image.' + ext)
         return super().to_internal_value(data)
 
 
@@ -143,7 +180,7 @@ class CreateRecipeSerializer(serializers.ModelSerializer):
     ingredients = CreateIngredientAmountSerializer(
         many=True
     )
-    tags = serializers.PrimaryKeyRelatedField(
+    tags = CachedTagField(
         many=True, queryset=Tag.objects.all()
     )
     image = Base64ImageField()
@@ -171,9 +208,7 @@ class CreateRecipeSerializer(serializers.ModelSerializer):
         RecipeIngredient.objects.bulk_create([
             RecipeIngredient(
                 recipe=recipe,
-                ingredient=Ingredient.objects.get(
-                    id=ingredient_data.get('id')
-                ),
+                ingredient_id=ingredient_data.get('id'),
                 amount=ingredient_data['amount']
             ) for ingredient_data in sentence
         ])
@@ -182,15 +217,17 @@ class CreateRecipeSerializer(serializers.ModelSerializer):
         validated_data['author'] = self.context['request'].user
         ingredients_data = validated_data.pop('ingredients')
         tags_data = validated_data.pop('tags')
-        list_of_tags: list = []
-        recipe = Recipe.objects.create(**validated_data)
-        for tag in tags_data:
-            current_tag = get_object_or_404(Tag, id=tag.id)
-            list_of_tags.append(current_tag)
-        recipe.tags.set(list_of_tags)
+        recipe = Recipe.objects.create(
+            **validated_data, ingredients_count=len(ingredients_data)
+        )
+        recipe.tags.set(tags_data)
         self.bulk_creating_recipe_ingredients(
             sentence=ingredients_data, recipe=recipe
         )
+        record_ingredient_usage(
+            [recipe.author_id],
+            added=[ingredient['id'] for ingredient in ingredients_data]
+        )
         return recipe
 
     def update(self, instance, validated_data):
@@ -199,14 +236,24 @@ class CreateRecipeSerializer(serializers.ModelSerializer):
         instance.cooking_time = validated_data.get(
             'cooking_time', instance.cooking_time
         )
+        if 'image' in validated_data:
+            instance.image = validated_data.pop('image')
         if 'tags' in validated_data:
             tags_data = validated_data.pop('tags')
             instance.tags.set(tags_data)
         ingredients_data = validated_data.pop('ingredients')
+        instance.ingredients_count = len(ingredients_data)
+        previous = list(instance.recipe_ingredients.values_list(
+            'ingredient_id', flat=True
+        ))
         instance.recipe_ingredients.all().delete()
         self.bulk_creating_recipe_ingredients(
             sentence=ingredients_data, recipe=instance
         )
+        record_ingredient_usage(
+            [instance.author_id], removed=previous,
+            added=[ingredient['id'] for ingredient in ingredients_data]
+        )
         instance.save()
         return instance
 
@@ -229,18 +276,62 @@ class CreateRecipeSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 'Ingredients should be unique!'
             )
-        for ingredient_data in ingredients:
-            try:
-                Ingredient.objects.get(
-                    id=ingredient_data.get('id')
-                )
-            except Ingredient.DoesNotExist:
-                raise serializers.ValidationError(
-                    'Not existing ingredient'
-                )
+        if (len(ingredient_references.get_many(len_unit_in_ingredients))
+                != len(len_unit_in_ingredients)):
+            raise serializers.ValidationError(
+                'Not existing ingredient'
+            )
         return data
 
 
+class IngestRecipeSerializer(serializers.Serializer):
+    """One row of a bulk ingestion, validated without database queries.
+
+    ``image`` is a data URI or an http(s) URL; it is fetched and attached
+    by a background job after the recipe is stored. Tags and ingredients
+    are checked against the ``tags`` and ``ingredients`` maps passed in
+    the context, snapshotted once per batch.
+    """
+
+    name = serializers.CharField(max_length=200)
+    text = serializers.CharField(max_length=2048)
+    cooking_time = serializers.IntegerField(
+        min_value=settings.CONSTANTS.get('MIN_TIME_BOUNDARY'),
+        max_value=settings.CONSTANTS.get('MAX_TIME_BOUNDARY')
+    )
+    tags = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False
+    )
+    ingredients = CreateIngredientAmountSerializer(many=True)
+    image = serializers.CharField(required=False)
+
+    def validate_tags(self, tags):
+        if len(tags) != len(set(tags)):
+            raise serializers.ValidationError('Tags should be unique!')
+        if not all(tag in self.context['tags'] for tag in tags):
+            raise serializers.ValidationError('Not existing tag')
+        return tags
+
+    def validate_ingredients(self, ingredients):
+        ids = [ingredient['id'] for ingredient in ingredients]
+        if not ids:
+            raise serializers.ValidationError(
+                'Ingredients list cant be empty!'
+            )
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError('Ingredients should be unique!')
+        if not all(pk in self.context['ingredients'] for pk in ids):
+            raise serializers.ValidationError('Not existing ingredient')
+        return ingredients
+
+    def validate_image(self, image):
+        if not image.startswith(('data:image', 'http://', 'https://')):
+            raise serializers.ValidationError(
+                'Image should be a data URI or an http(s) URL'
+            )
+        return image
+
+
 class FollowingSerializer(UserRetrieveListSerializer):
     recipes_count = serializers.SerializerMethodField()
     recipes = serializers.SerializerMethodField()
@@ -251,28 +342,63 @@ class FollowingSerializer(UserRetrieveListSerializer):
         read_only_fields = ('email', 'username')
 
     def validate(self, data):
-        author = self.instance
-        user = self.context['request'].user
-        if author.subscribing.filter(user=user).exists():
+        if self.context['request'].user == self.instance:
             raise serializers.ValidationError(
-                detail='Вы уже подписаны на этого пользователя!',
+                detail='Вы не можете подписаться на самого себя!',
                 code=status.HTTP_400_BAD_REQUEST
             )
-        if user == author:
+        return data
+
+    def save(self, **kwargs):
+        user = self.context['request'].user
+        if not Follow.objects.add(user, self.instance.id):
             raise serializers.ValidationError(
-                detail='Вы не можете подписаться на самого себя!',
+                detail={api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Вы уже подписаны на этого пользователя!'
+                ]},
                 code=status.HTTP_400_BAD_REQUEST
             )
-        return data
+        invalidate_followed_author_ids(user.id)
+        schedule_suggestions_refresh(user.id)
+        return self.instance
 
     def get_recipes_count(self, obj):
+        if hasattr(obj, 'recipes_count'):
+            return obj.recipes_count
         return obj.recipes.count()
 
+    @staticmethod
+    def recipes_limit(request) -> int:
+        """Validated ``recipes_limit``, capped at MAX_RECIPES_LIMIT.
+
+        Views check it once before serializing and pass it in the
+        ``recipes_limit`` context key.
+        """
+        limit = request.query_params.get('recipes_limit', '')
+        if limit and not limit.isdigit():
+            raise serializers.ValidationError(
+                {'recipes_limit': ['Must be a non-negative integer']}
+            )
+        return min(
+            int(limit or settings.MAX_RECIPES_LIMIT),
+            settings.MAX_RECIPES_LIMIT
+        )
+
     def get_recipes(self, obj):
-        request = self.context.get('request')
-        limit = request.GET.get('recipes_limit')
-        recipes = obj.recipes.all()
-        if limit:
-            recipes = recipes[:int(limit)]
+        if hasattr(obj, 'limited_recipes'):
+            recipes = obj.limited_recipes
+        else:
+            recipes = obj.recipes.all()[:self.context.get(
+                'recipes_limit', settings.MAX_RECIPES_LIMIT
+            )]
         serializer = RecipeShortSerializer(recipes, many=True, read_only=True)
         return serializer.data
+
+
+class NotificationSerializer(serializers.ModelSerializer):
+    recipe = RecipeShortSerializer(read_only=True)
+    author = UserRetrieveListSerializer(source='recipe.author', read_only=True)
+
+    class Meta:
+        model = Notification
+        fields = ('id', 'author', 'recipe', 'is_read', 'created_at')
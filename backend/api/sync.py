@@ -0,0 +1,131 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime, timedelta
+from heapq import merge
+from itertools import islice
+
+from django.conf import settings
+from django.db import connections, router
+from django.db.models import Q
+from django.utils import timezone
+
+from foods.models import Recipe, RecipeTombstone
+from .documents import get_documents
+
+BATCH_SIZE = 200
+# Start of the oldest transaction of another client that is still open.
+OLDEST_TRANSACTION_SQL = '''
+SELECT min(xact_start) FROM pg_stat_activity
+WHERE datname = current_database() AND pid <> pg_backend_pid()
+    AND backend_type = 'client backend'
+'''
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(moment: datetime, pk: int) -> str:
+    raw = f'{moment.isoformat()}|{pk}'.encode()
+    return urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str):
+    try:
+        raw = urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        moment, pk = raw.decode().split('|')
+        return datetime.fromisoformat(moment), int(pk)
+    except ValueError as error:
+        raise InvalidCursor(str(error))
+
+
+def _after(queryset, time_field, id_field, since, until):
+    if since is not None:
+        moment, pk = since
+        queryset = queryset.filter(
+            Q(**{f'{time_field}__gt': moment})
+            | Q(**{time_field: moment, f'{id_field}__gt': pk})
+        )
+    return queryset.filter(**{f'{time_field}__lt': until}).order_by(
+        time_field, id_field
+    ).values_list(time_field, id_field)
+
+
+def _horizon(alias):
+    """Moment before which every feed row is known to be committed.
+
+    Rows are stamped when written, not when committed, so a transaction
+    that is still open (a large ingest or ``delete_users``) can commit
+    rows older than any fixed lag. On PostgreSQL the horizon therefore
+    stops at the start of the oldest open transaction; other databases
+    rely on SYNC_SAFETY_LAG alone, which writes to them must not
+    outlast. The lag also absorbs clock skew between web hosts.
+    """
+    horizon = timezone.now()
+    connection = connections[alias]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(OLDEST_TRANSACTION_SQL)
+            oldest = cursor.fetchone()[0]
+        if oldest is not None:
+            horizon = min(horizon, oldest)
+    return horizon - timedelta(seconds=settings.SYNC_SAFETY_LAG)
+
+
+def changes(since, limit: int):
+    """Yield ``(moment, id, deleted)`` after ``since`` in feed order.
+
+    Rows after the commit horizon are held back so a transaction
+    committing late cannot land behind a handed-out cursor. The feed
+    reads the primary: a lagging replica would hide rows the same way.
+    """
+    alias = router.db_for_write(Recipe)
+    until = _horizon(alias)
+    updated = (
+        (moment, pk, False) for moment, pk in _after(
+            Recipe.objects.using(alias), 'updated_at', 'id', since, until
+        )[:limit].iterator()
+    )
+    deleted = (
+        (moment, pk, True) for moment, pk in _after(
+            RecipeTombstone.objects.using(alias), 'deleted_at',
+            'recipe_id', since, until
+        )[:limit].iterator()
+    )
+    return islice(merge(updated, deleted), limit)
+
+
+def stream_changes(since, limit: int, request):
+    """NDJSON lines for a page of the change feed, ending with a cursor.
+
+    Every line carries the cursor to resume after it, the last line
+    says whether another page is waiting.
+    """
+    sent = 0
+    cursor = encode_cursor(*since) if since else None
+    feed = changes(since, limit + 1)
+    while True:
+        batch = list(islice(feed, BATCH_SIZE))
+        page = batch[:limit - sent]
+        documents = get_documents(
+            [pk for _, pk, deleted in page if not deleted]
+        )
+        for moment, pk, deleted in page:
+            cursor = encode_cursor(moment, pk)
+            if deleted or pk not in documents:
+                line = {'type': 'deleted', 'id': pk, 'cursor': cursor}
+            else:
+                recipe = dict(documents[pk])
+                if recipe['image']:
+                    recipe['image'] = request.build_absolute_uri(
+                        recipe['image']
+                    )
+                line = {'type': 'recipe', 'recipe': recipe, 'cursor': cursor}
+            yield json.dumps(line, ensure_ascii=False) + '\n'
+        sent += len(page)
+        if len(page) < len(batch) or len(batch) < BATCH_SIZE:
+            has_more = len(page) < len(batch)
+            break
+    yield json.dumps({
+        'type': 'end', 'cursor': cursor, 'has_more': has_more
+    }) + '\n'
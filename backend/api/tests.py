@@ -0,0 +1,160 @@
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from time import sleep
+from unittest import skipUnless
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from foods.models import Favorite, Recipe, ShoppingList
+from users.models import Follow
+
+User = get_user_model()
+
+THREADS = 8
+
+
+class ConcurrentToggleTests(TransactionTestCase):
+    """Parallel requests to a toggle store one row and succeed once."""
+
+    def setUp(self):
+        self.author = User.objects.create_user(
+            'author@example.com', 'author', 'Toggle', 'Author', None
+        )
+        self.user = User.objects.create_user(
+            'user@example.com', 'user', 'Toggle', 'User', None
+        )
+        self.recipe = Recipe.objects.create(
+            author=self.author, name='toggle', text='toggle',
+            cooking_time=1, image='recipes/images/toggle.png'
+        )
+
+    def _concurrently(self, method, url) -> Counter:
+        def request(_):
+            client = APIClient()
+            client.force_authenticate(self.user)
+            try:
+                return getattr(client, method)(url).status_code
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=THREADS) as pool:
+            return Counter(pool.map(request, range(THREADS)))
+
+    def _check_toggle(self, url, rows):
+        self.assertEqual(
+            self._concurrently('post', url),
+            {HTTPStatus.CREATED: 1, HTTPStatus.BAD_REQUEST: THREADS - 1}
+        )
+        self.assertEqual(rows.count(), 1)
+        self.assertEqual(
+            self._concurrently('delete', url),
+            {HTTPStatus.NO_CONTENT: 1, HTTPStatus.BAD_REQUEST: THREADS - 1}
+        )
+        self.assertEqual(rows.count(), 0)
+
+    def test_favorite(self):
+        self._check_toggle(
+            f'/api/recipes/{self.recipe.id}/favorite/',
+            Favorite.objects.filter(author=self.user, recipe=self.recipe)
+        )
+
+    def test_shopping_cart(self):
+        self._check_toggle(
+            f'/api/recipes/{self.recipe.id}/shopping_cart/',
+            ShoppingList.objects.filter(author=self.user, recipe=self.recipe)
+        )
+
+    def test_subscribe(self):
+        self._check_toggle(
+            f'/api/users/{self.author.id}/subscribe/',
+            Follow.objects.filter(user=self.user, author=self.author)
+        )
+
+
+class RecipesLimitTests(TestCase):
+    """``recipes_limit`` is checked even when nothing is serialized."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'user@example.com', 'user', 'Limit', 'User', None
+        )
+        self.author = User.objects.create_user(
+            'author@example.com', 'author', 'Limit', 'Author', None
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_subscriptions_without_follows(self):
+        response = self.client.get(
+            '/api/users/subscriptions/', {'recipes_limit': 'x'}
+        )
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_subscribe_does_not_follow(self):
+        response = self.client.post(
+            f'/api/users/{self.author.id}/subscribe/?recipes_limit=-1'
+        )
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertFalse(Follow.objects.exists())
+
+
+@skipUnless(settings.REPLICA_DATABASES, 'DB_REPLICAS is not set')
+@override_settings(REPLICA_PIN_SECONDS=1)
+class ReplicaRoutingTests(TransactionTestCase):
+    """Reads go to a replica unless the client wrote within the pin.
+
+    Replicas mirror ``default`` in tests, so which connection ran the
+    queries tells where a request was routed.
+    """
+
+    databases = '__all__'
+
+    def setUp(self):
+        self.replica = connections[settings.REPLICA_DATABASES[0]]
+        self.primary = connections['default']
+        user = User.objects.create_user(
+            'user@example.com', 'user', 'Replica', 'User', None
+        )
+        self.recipe = Recipe.objects.create(
+            author=user, name='replica', text='replica',
+            cooking_time=1, image='recipes/images/replica.png'
+        )
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=user)}'
+        )
+
+    def _queries(self, method, url, status):
+        with CaptureQueriesContext(self.replica) as replica, \
+                CaptureQueriesContext(self.primary) as primary:
+            response = getattr(self.client, method)(url)
+        self.assertEqual(response.status_code, status)
+        return len(replica), len(primary)
+
+    def _read(self):
+        return self._queries('get', '/api/recipes/', HTTPStatus.OK)
+
+    def test_reads_use_replica(self):
+        replica, _ = self._read()
+        self.assertGreater(replica, 0)
+
+    def test_write_pins_reads_to_primary(self):
+        replica, primary = self._queries(
+            'post', f'/api/recipes/{self.recipe.id}/favorite/',
+            HTTPStatus.CREATED
+        )
+        self.assertEqual(replica, 0)
+        self.assertGreater(primary, 0)
+        replica, primary = self._read()
+        self.assertEqual(replica, 0)
+        self.assertGreater(primary, 0)
+        sleep(settings.REPLICA_PIN_SECONDS + 0.5)
+        replica, _ = self._read()
+        self.assertGreater(replica, 0)
@@ -1,6 +1,7 @@
 from django.urls import path, include, re_path
 from rest_framework.routers import DefaultRouter
 
+from api import views as api_views
 from users import views as users_views
 from foods import views as foods_views
 
@@ -16,6 +17,13 @@ router.register('recipes', foods_views.RecipeViewSet, basename='recipes')
 
 
 urlpatterns = [
+    path('health/ready', api_views.ready, name='health-ready'),
+    path('health/metrics', api_views.metrics, name='health-metrics'),
+    path('profiles/<slug:profile_id>/', api_views.profile, name='profile'),
+    path(
+        'profiles/<slug:profile_id>.prof', api_views.profile,
+        {'extension': 'prof'}, name='profile-download'
+    ),
     path('', include(router.urls)),
     re_path(r'^auth/', include('djoser.urls.authtoken'))
 ]
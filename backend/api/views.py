@@ -0,0 +1,36 @@
+from http import HTTPStatus
+
+from django.http import FileResponse, Http404, JsonResponse
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+
+from foodgram import metrics as foodgram_metrics
+from foodgram.profiling import profile_path
+from foodgram.warmup import status
+
+
+def ready(request):
+    warm_up = status()
+    return JsonResponse(
+        warm_up,
+        status=HTTPStatus.OK if warm_up['ready']
+        else HTTPStatus.SERVICE_UNAVAILABLE
+    )
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def metrics(request):
+    return JsonResponse(foodgram_metrics.snapshot())
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def profile(request, profile_id, extension='json'):
+    path = profile_path(profile_id, extension)
+    if not path.is_file():
+        raise Http404
+    return FileResponse(
+        path.open('rb'), as_attachment=extension == 'prof',
+        filename=path.name
+    )
@@ -0,0 +1,115 @@
+from collections import Counter
+
+from django.db import connections, router, transaction
+from django.db.models import CASCADE, DO_NOTHING, SET_NULL, ProtectedError
+
+DELETE_BATCH_SIZE = 2000
+
+
+def _table(model, field_names):
+    meta = model._meta
+    connection = connections[router.db_for_write(model)]
+    quote = connection.ops.quote_name
+    return (
+        connection, quote(meta.db_table),
+        [quote(meta.get_field(name).column) for name in field_names]
+    )
+
+
+def insert_link(model, owner_field, owner_id, target_field, target_id,
+                exclude_owner=False, values=None) -> bool:
+    """Insert an ``(owner, target)`` row in a single statement.
+
+    Uses ``INSERT ... SELECT ... ON CONFLICT DO NOTHING`` so a missing
+    target or an existing pair (enforced by a unique constraint) insert
+    nothing. ``values`` sets extra columns. Returns True when a row was
+    created.
+    """
+    values = values or {}
+    connection, table, (owner, target, *extra) = _table(
+        model, (owner_field, target_field, *values)
+    )
+    target_model = model._meta.get_field(target_field).related_model
+    target_meta = target_model._meta
+    quote = connection.ops.quote_name
+    target_pk = quote(target_meta.pk.column)
+    columns = ''.join(f', {column}' for column in extra)
+    placeholders = ', %s' * len(extra)
+    sql = (
+        f'INSERT INTO {table} ({owner}, {target}{columns}) '
+        f'SELECT %s, {target_pk}{placeholders} '
+        f'FROM {quote(target_meta.db_table)} WHERE {target_pk} = %s'
+    )
+    params = [owner_id, *values.values(), target_id]
+    if exclude_owner:
+        sql += f' AND {target_pk} <> %s'
+        params.append(owner_id)
+    sql += ' ON CONFLICT DO NOTHING'
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount == 1
+
+
+def delete_link(model, owner_field, owner_id,
+                target_field, target_id) -> bool:
+    """Delete an ``(owner, target)`` row; True when a row was removed."""
+    connection, table, (owner, target) = _table(
+        model, (owner_field, target_field)
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {table} WHERE {owner} = %s AND {target} = %s',
+            [owner_id, target_id]
+        )
+        return cursor.rowcount > 0
+
+
+def _fast_delete(queryset, using, deleted: Counter) -> None:
+    model = queryset.model
+    # The same candidates as Django's collector, m2m through rows included.
+    dependents = [
+        relation for relation in model._meta.get_fields(include_hidden=True)
+        if relation.auto_created and not relation.concrete
+        and (relation.one_to_one or relation.one_to_many)
+        and relation.on_delete is not DO_NOTHING
+    ]
+    if not dependents:
+        deleted[model._meta.label] += queryset._raw_delete(using)
+        return
+    # Materialized first: the queryset may filter on rows deleted below.
+    pks = list(queryset.order_by().values_list('pk', flat=True))
+    for start in range(0, len(pks), DELETE_BATCH_SIZE):
+        batch = pks[start:start + DELETE_BATCH_SIZE]
+        for relation in dependents:
+            field = relation.field.name
+            related = relation.related_model._base_manager.using(
+                using
+            ).filter(**{f'{field}__in': batch})
+            if relation.on_delete is CASCADE:
+                _fast_delete(related, using, deleted)
+            elif relation.on_delete is SET_NULL:
+                related.update(**{field: None})
+            elif related.exists():
+                raise ProtectedError(
+                    f'{relation.related_model._meta.label} rows reference '
+                    f'the {model._meta.label} rows being deleted',
+                    set(related)
+                )
+        deleted[model._meta.label] += model._base_manager.using(
+            using
+        ).filter(pk__in=batch)._raw_delete(using)
+
+
+def fast_delete(queryset) -> tuple:
+    """Delete rows and their cascades with set-based statements.
+
+    Unlike ``QuerySet.delete()`` no objects are loaded and no signals
+    are sent, so callers apply the side effects of those signals
+    themselves. Returns ``(total, {label: count})`` like ``delete()``.
+    """
+    using = queryset._db or router.db_for_write(queryset.model)
+    deleted: Counter = Counter()
+    with transaction.atomic(using=using, savepoint=False):
+        _fast_delete(queryset.using(using), using, deleted)
+    deleted = {label: count for label, count in deleted.items() if count}
+    return sum(deleted.values()), deleted
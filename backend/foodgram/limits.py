@@ -0,0 +1,110 @@
+from threading import Condition
+from time import monotonic
+
+from django.conf import settings
+from django.http import JsonResponse
+from rest_framework.permissions import SAFE_METHODS
+
+from . import metrics
+
+
+class Gate:
+    """Concurrency cap with a short bounded queue for one endpoint.
+
+    Priority callers (authenticated writes) are admitted before queued
+    reads and are never turned away because the queue is full.
+    """
+
+    def __init__(self, name, limit, queue, timeout, retry_after=1):
+        self.name = name
+        self.limit = limit
+        self.queue = queue
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.active = 0
+        self.waiting = 0
+        self.priority_waiting = 0
+        self._condition = Condition()
+        metrics.register_gauge(f'gate.{name}', self.state)
+
+    def state(self) -> dict:
+        return {
+            'limit': self.limit, 'active': self.active,
+            'waiting': self.waiting, 'queue': self.queue,
+        }
+
+    def _free(self, priority: bool) -> bool:
+        return self.active < self.limit and (
+            priority or not self.priority_waiting
+        )
+
+    def acquire(self, priority: bool = False) -> bool:
+        with self._condition:
+            if self._free(priority):
+                self.active += 1
+                return True
+            if not priority and self.waiting >= self.queue:
+                metrics.incr(f'gate.{self.name}.rejected')
+                return False
+            self.waiting += 1
+            self.priority_waiting += priority
+            deadline = monotonic() + self.timeout
+            try:
+                while not self._free(priority):
+                    remaining = deadline - monotonic()
+                    if remaining <= 0:
+                        metrics.incr(f'gate.{self.name}.timed_out')
+                        return False
+                    self._condition.wait(remaining)
+            finally:
+                self.waiting -= 1
+                self.priority_waiting -= priority
+            self.active += 1
+            return True
+
+    def release(self) -> None:
+        with self._condition:
+            self.active -= 1
+            self._condition.notify_all()
+
+
+class LoadSheddingMiddleware:
+    """Answer 503 with Retry-After when an endpoint's gate is saturated.
+
+    Gates are configured per URL name in ``CONCURRENCY_LIMITS``; the
+    ``'*'`` entry, if present, covers every other endpoint. Limits are
+    per worker process.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.gates = {
+            name: Gate(name, **config)
+            for name, config in settings.CONCURRENCY_LIMITS.items()
+        }
+
+    def __call__(self, request):
+        request.load_shedding_gate = None
+        try:
+            return self.get_response(request)
+        finally:
+            if request.load_shedding_gate is not None:
+                request.load_shedding_gate.release()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        gate = self.gates.get(request.resolver_match.view_name)
+        gate = gate or self.gates.get('*')
+        if gate is None:
+            return None
+        priority = (request.method not in SAFE_METHODS
+                    and 'HTTP_AUTHORIZATION' in request.META)
+        if not gate.acquire(priority):
+            response = JsonResponse(
+                {'errors': 'Service is overloaded, retry later'},
+                status=503
+            )
+            response['Retry-After'] = str(gate.retry_after)
+            return response
+        metrics.incr(f'gate.{gate.name}.admitted')
+        request.load_shedding_gate = gate
+        return None
@@ -0,0 +1,26 @@
+from collections import defaultdict
+from threading import Lock
+
+_lock = Lock()
+_counters: dict = defaultdict(int)
+_gauges: dict = {}
+
+
+def incr(name: str, amount: int = 1) -> None:
+    with _lock:
+        _counters[name] += amount
+
+
+def register_gauge(name: str, read) -> None:
+    """Report ``read()`` under ``name`` in every snapshot."""
+    _gauges[name] = read
+
+
+def snapshot() -> dict:
+    """Per-process counters and gauges of this worker."""
+    with _lock:
+        counters = dict(_counters)
+    return {
+        'counters': counters,
+        'gauges': {name: read() for name, read in _gauges.items()},
+    }
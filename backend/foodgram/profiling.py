@@ -0,0 +1,120 @@
+import cProfile
+import io
+import json
+import pstats
+from contextlib import ExitStack
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter
+from uuid import uuid4
+
+from django.conf import settings
+from django.db import connections
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+PROFILE_PARAM = 'profile'
+
+
+def profile_path(profile_id, extension) -> Path:
+    return Path(settings.PROFILING_DIR) / f'{profile_id}.{extension}'
+
+
+def _is_staff(request) -> bool:
+    if request.user.is_authenticated:
+        return request.user.is_staff
+    keyword, _, key = request.META.get(
+        'HTTP_AUTHORIZATION', ''
+    ).partition(' ')
+    if keyword != TokenAuthentication.keyword or not key:
+        return False
+    try:
+        user, _ = TokenAuthentication().authenticate_credentials(key)
+    except AuthenticationFailed:
+        return False
+    return user.is_staff
+
+
+class _QueryLog:
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'alias': context['connection'].alias,
+                'sql': sql,
+                'time_ms': round((perf_counter() - started) * 1000, 3),
+            })
+
+
+def _prune() -> None:
+    profiles = sorted(
+        Path(settings.PROFILING_DIR).glob('*.json'),
+        key=lambda path: path.stat().st_mtime
+    )
+    for stale in profiles[:-settings.PROFILING_KEEP]:
+        stale.unlink(missing_ok=True)
+        stale.with_suffix('.prof').unlink(missing_ok=True)
+
+
+class ProfilingMiddleware:
+    """Profile a request for staff asking with ``X-Profile`` or ``?profile``.
+
+    Installed only when ``PROFILING_ENABLED`` is set. The cProfile dump
+    and a JSON report with timings and the SQL log are written to
+    ``PROFILING_DIR`` and served by ``/api/profiles/<id>/``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not (request.META.get(PROFILE_HEADER)
+                or PROFILE_PARAM in request.GET) or not _is_staff(request):
+            return self.get_response(request)
+        profile_id = f'{datetime.now():%Y%m%dT%H%M%S}-{uuid4().hex[:8]}'
+        profiler = cProfile.Profile()
+        log = _QueryLog()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(log))
+            started = perf_counter()
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+                elapsed = perf_counter() - started
+        self._save(profile_id, request, response, profiler, log, elapsed)
+        response['X-Profile-Id'] = profile_id
+        return response
+
+    def _save(self, profile_id, request, response, profiler, log, elapsed):
+        Path(settings.PROFILING_DIR).mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(profile_path(profile_id, 'prof'))
+        stats = io.StringIO()
+        pstats.Stats(profiler, stream=stats).sort_stats(
+            'cumulative'
+        ).print_stats(40)
+        report = {
+            'id': profile_id,
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            'total_ms': round(elapsed * 1000, 3),
+            'sql_ms': round(sum(
+                query['time_ms'] for query in log.queries
+            ), 3),
+            'sql_count': len(log.queries),
+            'queries': log.queries,
+            'stats': stats.getvalue(),
+        }
+        profile_path(profile_id, 'json').write_text(
+            json.dumps(report, ensure_ascii=False, indent=2)
+        )
+        _prune()
@@ -0,0 +1,86 @@
+from contextvars import ContextVar
+from hashlib import sha256
+from random import choice
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+
+PIN_KEY = 'foodgram:replicas:pin:{}'
+# Tokens are created by a write and read by the very next request.
+PRIMARY_ONLY_MODELS = {'authtoken.token'}
+
+_read_alias: ContextVar = ContextVar('read_alias', default=None)
+
+
+class ReplicaRouter:
+    """Send reads to the alias chosen for the current request."""
+
+    def db_for_read(self, model, **hints):
+        if model._meta.label_lower in PRIMARY_ONLY_MODELS:
+            return 'default'
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+def read_alias() -> str:
+    """Alias the current request reads from."""
+    return _read_alias.get() or 'default'
+
+
+def _client_key(request):
+    credentials = request.META.get('HTTP_AUTHORIZATION')
+    if not credentials:
+        return None
+    return PIN_KEY.format(sha256(credentials.encode()).hexdigest())
+
+
+def is_pinned(request) -> bool:
+    key = _client_key(request)
+    return key is not None and cache.get(key) is not None
+
+
+def pin_to_primary(request) -> None:
+    key = _client_key(request)
+    if key is not None:
+        cache.set(key, 1, settings.REPLICA_PIN_SECONDS)
+
+
+class ReplicaRoutingMiddleware:
+    """Route safe requests of ``replica_reads`` views to a replica.
+
+    Clients that wrote recently stay on the primary for
+    ``REPLICA_PIN_SECONDS`` so they always read their own writes.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.replica_token = None
+        try:
+            response = self.get_response(request)
+        finally:
+            if request.replica_token is not None:
+                _read_alias.reset(request.replica_token)
+        if (request.method not in SAFE_METHODS
+                and response.status_code < 400):
+            pin_to_primary(request)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'cls', None)
+        if (request.method in SAFE_METHODS
+                and getattr(view_class, 'replica_reads', False)
+                and not is_pinned(request)):
+            request.replica_token = _read_alias.set(
+                choice(settings.REPLICA_DATABASES)
+            )
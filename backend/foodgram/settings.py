@@ -1,6 +1,8 @@
 from pathlib import Path
+import json
 import os
 
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -35,6 +37,7 @@ INSTALLED_APPS = [
     'users',
     'foods',
     'api',
+    'jobs',
 ]
 
 MIDDLEWARE = [
@@ -43,6 +46,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'foodgram.limits.LoadSheddingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -75,7 +79,16 @@ if os.getenv('POSTGRES_DATABASE', 'True') == 'True':
             'USER': os.getenv('POSTGRES_USER', 'postgres'),
             'PASSWORD': os.getenv('POSTGRES_PASSWORD', 'admin'),
             'HOST': os.getenv('DB_HOST', 'localhost'),
-            'PORT': os.getenv('DB_PORT', '5432')
+            'PORT': os.getenv('DB_PORT', '5432'),
+            # Seconds to keep a connection open between requests
+            # (0 closes it after every request, None keeps it forever).
+            'CONN_MAX_AGE': (
+                int(os.getenv('DB_CONN_MAX_AGE', 60))
+                if os.getenv('DB_CONN_MAX_AGE') != 'None' else None
+            ),
+            'CONN_HEALTH_CHECKS': (
+                os.getenv('DB_CONN_HEALTH_CHECKS', 'True') == 'True'
+            ),
         }
     }
 else:
@@ -83,9 +96,174 @@ else:
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            # A file instead of the shared in-memory database, whose
+            # table locks ignore the busy timeout of concurrent tests.
+            'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
         }
     }
 
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'foodgram'),
+    }
+}
+
+# Backends keeping entries inside one process. Recipe documents,
+# followed authors and users' ingredient usage are invalidated by other
+# gunicorn workers and by job workers, so they are only cached in a
+# shared backend such as django.core.cache.backends.redis.RedisCache.
+LOCAL_CACHE_BACKENDS = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+SHARED_CACHE = CACHES['default']['BACKEND'] not in LOCAL_CACHE_BACKENDS
+
+# Seconds a worker may keep its copy of tags and ingredients
+# without seeing a version change (covers non-shared cache backends).
+REFERENCE_CACHE_TTL = int(os.getenv('REFERENCE_CACHE_TTL', 300))
+# Seconds a worker trusts the last version stamp it read before
+# asking the cache again.
+REFERENCE_VERSION_INTERVAL = float(
+    os.getenv('REFERENCE_VERSION_INTERVAL', 1)
+)
+
+# Upper bound on how long a cached recipe document may outlive a write
+# that bypassed the serializer write path (admin, bulk updates).
+RECIPE_DOCUMENT_TIMEOUT = int(os.getenv('RECIPE_DOCUMENT_TIMEOUT', 3600))
+
+# Space separated replica hosts (file names for SQLite). Safe requests
+# to views with ``replica_reads = True`` are served from a replica.
+REPLICA_DATABASES = []
+for number, location in enumerate(
+    os.getenv('DB_REPLICAS', '').split(), start=1
+):
+    alias = f'replica_{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST' if 'HOST' in DATABASES['default'] else 'NAME': location,
+        'OPTIONS': dict(DATABASES['default'].get('OPTIONS', {})),
+        'TEST': {'MIRROR': 'default'},
+    }
+    REPLICA_DATABASES.append(alias)
+
+# Seconds a client keeps reading from the primary after a write.
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', 5))
+
+if REPLICA_DATABASES:
+    # The read-your-writes pin is set by the worker handling the write
+    # and read by whichever worker gets the next request.
+    if not SHARED_CACHE:
+        raise ImproperlyConfigured(
+            'DB_REPLICAS needs a shared CACHE_BACKEND for primary pins'
+        )
+    DATABASE_ROUTERS = ['foodgram.replicas.ReplicaRouter']
+    MIDDLEWARE.append('foodgram.replicas.ReplicaRoutingMiddleware')
+
+# PostgreSQL statement timeouts in milliseconds keyed by URL name;
+# STATEMENT_TIMEOUT (0 is none) covers views without an entry or a
+# foodgram.timeouts.statement_timeout decorator. Cancelled statements
+# answer 503. Extra or overriding entries can be given as JSON.
+STATEMENT_TIMEOUT = int(os.getenv('STATEMENT_TIMEOUT', 0))
+STATEMENT_TIMEOUTS = {
+    'recipes-list': 2000,
+    'recipes-detail': 1000,
+    'ingredients-list': 1000,
+    'users-list': 2000,
+    'users-subscriptions': 2000,
+    **json.loads(os.getenv('STATEMENT_TIMEOUTS', '{}')),
+}
+MIDDLEWARE.append('foodgram.timeouts.StatementTimeoutMiddleware')
+
+# Caps on page sizes (``limit``), on how deep page numbers may reach
+# and on ``recipes_limit`` of subscriptions.
+MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', 100))
+MAX_PAGE_OFFSET = int(os.getenv('MAX_PAGE_OFFSET', 10000))
+MAX_RECIPES_LIMIT = int(os.getenv('MAX_RECIPES_LIMIT', 50))
+
+# Staff can profile a request with an ``X-Profile`` header or a
+# ``?profile`` parameter. Off by default: the middleware is not even
+# installed then. The newest PROFILING_KEEP reports are kept.
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'False') == 'True'
+PROFILING_DIR = os.getenv('PROFILING_DIR', BASE_DIR / 'profiles')
+PROFILING_KEEP = int(os.getenv('PROFILING_KEEP', 50))
+
+if PROFILING_ENABLED:
+    MIDDLEWARE.append('foodgram.profiling.ProfilingMiddleware')
+
+# Background jobs (python manage.py run_workers)
+JOB_CONCURRENCY = int(os.getenv('JOB_CONCURRENCY', 4))
+JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', 1))
+# Seconds before a running job of a silent worker is queued again.
+JOB_LOCK_TIMEOUT = int(os.getenv('JOB_LOCK_TIMEOUT', 600))
+# Base delay in seconds for exponential retry backoff.
+JOB_RETRY_DELAY = int(os.getenv('JOB_RETRY_DELAY', 10))
+# Seconds to keep finished jobs around.
+JOB_RETENTION = int(os.getenv('JOB_RETENTION', 7 * 24 * 60 * 60))
+
+# Per worker caps for expensive endpoints keyed by URL name. Waiting
+# requests hold a worker thread, so queues are short and bounded.
+# Extra or overriding entries can be given as JSON in the environment.
+CONCURRENCY_LIMITS = {
+    'recipes-download-shopping-cart': {'limit': 1, 'queue': 2, 'timeout': 1},
+    'ingredients-list': {'limit': 2, 'queue': 4, 'timeout': 0.5},
+    'users-subscriptions': {'limit': 1, 'queue': 2, 'timeout': 1},
+    'recipes-ingest': {'limit': 1, 'queue': 1, 'timeout': 1},
+    **json.loads(os.getenv('CONCURRENCY_LIMITS', '{}')),
+}
+
+# How recipe views build their JSON, keyed by URL name: 'orm'
+# (serializers over cached documents) or 'database' (PostgreSQL builds
+# the JSON; ignored on other databases). JSON in the environment
+# overrides entries, e.g. {"recipes-list": "database"}.
+RECIPE_RENDERING = {
+    'recipes-list': 'orm',
+    'recipes-detail': 'orm',
+    **json.loads(os.getenv('RECIPE_RENDERING', '{}')),
+}
+
+# /api/recipes/changes/ page sizes and the age below which changed rows
+# are held back until concurrent transactions had time to commit. On
+# PostgreSQL rows written after the oldest open transaction started are
+# held back as well; on other databases no write may take longer.
+SYNC_PAGE_SIZE = int(os.getenv('SYNC_PAGE_SIZE', 1000))
+SYNC_MAX_PAGE_SIZE = int(os.getenv('SYNC_MAX_PAGE_SIZE', 5000))
+SYNC_SAFETY_LAG = int(os.getenv('SYNC_SAFETY_LAG', 2))
+
+# /api/users/suggestions/: authors kept per user, how much favorites of
+# an author's recipes count against mutual follows, and how long follow
+# changes are collected before a user's suggestions are recomputed.
+SUGGESTION_LIMIT = int(os.getenv('SUGGESTION_LIMIT', 30))
+SUGGESTION_POPULARITY_WEIGHT = float(
+    os.getenv('SUGGESTION_POPULARITY_WEIGHT', 0.5)
+)
+SUGGESTION_REFRESH_DELAY = int(os.getenv('SUGGESTION_REFRESH_DELAY', 30))
+
+# New recipes are announced to followers by jobs: each job notifies the
+# next NOTIFICATION_FAN_OUT_BATCH followers, inserting rows in chunks of
+# NOTIFICATION_INSERT_BATCH, then queues the next job.
+NOTIFICATION_FAN_OUT_BATCH = int(
+    os.getenv('NOTIFICATION_FAN_OUT_BATCH', 10000)
+)
+NOTIFICATION_INSERT_BATCH = int(os.getenv('NOTIFICATION_INSERT_BATCH', 2000))
+
+
+# Favorites exported as PDF cookbooks by a job (GET/POST
+# /api/recipes/cookbook/). Pages are rendered by COOKBOOK_PROCESSES
+# processes; one file per user and favorites version is kept.
+COOKBOOK_DIR = os.getenv('COOKBOOK_DIR', BASE_DIR / 'exports')
+COOKBOOK_PROCESSES = int(os.getenv('COOKBOOK_PROCESSES', 2))
+COOKBOOK_MAX_RECIPES = int(os.getenv('COOKBOOK_MAX_RECIPES', 500))
+# A TrueType font with Cyrillic glyphs; Pillow's default otherwise.
+COOKBOOK_FONT = os.getenv(
+    'COOKBOOK_FONT', '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf'
+)
+
+# Dotted path of the ingredient search backend; by default the one for
+# the database engine (foods.search.BACKENDS).
+SEARCH_BACKEND = os.getenv('SEARCH_BACKEND', '')
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -147,4 +325,6 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 CONSTANTS: dict[str, str | int] = {
     'MIN_TIME_BOUNDARY': 1,
     'MAX_TIME_BOUNDARY': 32_000,
+    'MIN_SERVINGS': 1,
+    'MAX_SERVINGS': 100,
 }
@@ -0,0 +1,101 @@
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import OperationalError, connections, transaction
+from django.http import JsonResponse
+from rest_framework.permissions import SAFE_METHODS
+
+from . import metrics
+from .replicas import read_alias
+
+QUERY_CANCELED = '57014'
+
+
+def statement_timeout(milliseconds):
+    """Set the statement timeout of a view function or viewset action.
+
+    STATEMENT_TIMEOUTS entries for the URL name take precedence.
+    """
+    def decorate(view):
+        view.statement_timeout = milliseconds
+        return view
+    return decorate
+
+
+def _view_timeout(request, view_func):
+    timeout = settings.STATEMENT_TIMEOUTS.get(
+        request.resolver_match.view_name
+    )
+    if timeout is None:
+        method = request.method.lower()
+        actions = getattr(view_func, 'actions', None) or {}
+        handler = getattr(
+            getattr(view_func, 'cls', None), actions.get(method, method),
+            view_func
+        )
+        timeout = getattr(handler, 'statement_timeout', None)
+    return settings.STATEMENT_TIMEOUT if timeout is None else timeout
+
+
+def is_query_canceled(exception) -> bool:
+    return (isinstance(exception, OperationalError)
+            and getattr(exception.__cause__, 'pgcode', None)
+            == QUERY_CANCELED)
+
+
+class StatementTimeoutMiddleware:
+    """Cap how long PostgreSQL may run the statements of a read.
+
+    Safe requests run in a transaction on the alias they read from,
+    opened with ``SET LOCAL statement_timeout``, so the setting never
+    leaks to other requests sharing the connection. Must come after
+    ``ReplicaRoutingMiddleware`` to see the chosen alias. Cancelled
+    statements answer 503 and are counted in the metrics; any other
+    exception rolls the transaction back.
+
+    Writes are not covered: the transaction would defer their
+    ``on_commit`` hooks to the end of the request and make their
+    ``IntegrityError`` handling abort it. Queries on other aliases
+    than the read one and streaming responses, which query after the
+    view returned, are not covered either.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.statement_timeout_alias = None
+        with ExitStack() as request.statement_timeout_stack:
+            return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method not in SAFE_METHODS:
+            return None
+        timeout = _view_timeout(request, view_func)
+        alias = read_alias()
+        connection = connections[alias]
+        if not timeout or connection.vendor != 'postgresql':
+            return None
+        request.statement_timeout_stack.enter_context(
+            transaction.atomic(using=alias)
+        )
+        request.statement_timeout_alias = alias
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL statement_timeout = %s', [timeout])
+        return None
+
+    def process_exception(self, request, exception):
+        if request.statement_timeout_alias is not None:
+            transaction.set_rollback(
+                True, using=request.statement_timeout_alias
+            )
+        if not is_query_canceled(exception):
+            return None
+        metrics.incr('statement_timeout')
+        metrics.incr(
+            f'statement_timeout.{request.resolver_match.view_name}'
+        )
+        return JsonResponse(
+            {'errors': 'The request took too long, narrow it down'},
+            status=503
+        )
@@ -0,0 +1,79 @@
+import logging
+from time import perf_counter
+
+from django.db import connection
+from django.urls import get_resolver, reverse
+
+logger = logging.getLogger(__name__)
+
+_status: dict = {
+    'ready': False,
+    'startup_ms': None,
+    'steps_ms': {},
+}
+
+
+def _routes():
+    get_resolver().reverse_dict
+    reverse('recipes-list')
+
+
+def _serializers():
+    from api import documents, serializers
+
+    for serializer_class in (
+        serializers.RecipeSerializer,
+        serializers.CreateRecipeSerializer,
+        serializers.RecipeShortSerializer,
+        serializers.UserRetrieveListSerializer,
+        serializers.FollowingSerializer,
+        serializers.TagSerializer,
+        serializers.IngredientSerializer,
+        documents.RecipeDocumentSerializer,
+    ):
+        serializer_class().fields
+
+
+def _reference_data():
+    from foods.reference import ingredient_references, tag_references
+
+    tag_references.rows()
+    ingredient_references.rows()
+
+
+def _database():
+    # Only the calling thread's connection is opened; gthread workers
+    # still connect lazily from their request threads.
+    connection.ensure_connection()
+
+
+STEPS = (
+    ('routes', _routes),
+    ('serializers', _serializers),
+    ('reference_data', _reference_data),
+    ('database', _database),
+)
+
+
+def warm_up(booted_at=None) -> dict:
+    """Run every warm-up step once and mark the process ready."""
+    started = perf_counter()
+    for name, step in STEPS:
+        step_started = perf_counter()
+        step()
+        _status['steps_ms'][name] = round(
+            (perf_counter() - step_started) * 1000, 2
+        )
+    _status['startup_ms'] = round(
+        (perf_counter() - (booted_at or started)) * 1000, 2
+    )
+    _status['ready'] = True
+    logger.info(
+        'Warm-up finished in %s ms: %s',
+        _status['startup_ms'], _status['steps_ms']
+    )
+    return _status
+
+
+def status() -> dict:
+    return _status
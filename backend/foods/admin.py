@@ -1,41 +1,114 @@
 from django.contrib import admin
 from django.contrib.admin import display
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 
+from foodgram.paginators import EstimatedCountPaginator
 from . import models as foods_models
+from .deletion import delete_recipes
+from .usage import record_ingredient_usage
+
+
+class RecipeIngredientInline(admin.TabularInline):
+    model = foods_models.RecipeIngredient
+    autocomplete_fields = ('ingredient',)
+    extra = 0
 
 
 @admin.register(foods_models.Recipe)
 class RecipeAdmin(admin.ModelAdmin):
     list_display = ('name', 'id', 'author', 'added_in_favorites')
+    list_select_related = ('author',)
     readonly_fields = ('added_in_favorites',)
-    list_filter = ('author', 'name', 'tags',)
+    list_filter = ('tags',)
+    search_fields = ('name', 'author__username')
+    raw_id_fields = ('author',)
+    autocomplete_fields = ('tags',)
+    inlines = (RecipeIngredientInline,)
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+
+    def save_related(self, request, form, formsets, change):
+        recipe = form.instance
+        previous = list(recipe.recipe_ingredients.values_list(
+            'ingredient_id', flat=True
+        ))
+        super().save_related(request, form, formsets, change)
+        current = list(recipe.recipe_ingredients.values_list(
+            'ingredient_id', flat=True
+        ))
+        record_ingredient_usage(
+            [recipe.author_id], removed=previous, added=current
+        )
+        recipe.ingredients_count = len(current)
+        recipe.save(update_fields=['ingredients_count'])
+
+    def delete_model(self, request, obj):
+        delete_recipes(foods_models.Recipe.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        delete_recipes(queryset)
 
-    @display(description='Count recipes in favorites')
+    def get_queryset(self, request):
+        favorites = foods_models.Favorite.objects.filter(
+            recipe=OuterRef('pk')
+        ).order_by().values('recipe').annotate(
+            total=Count('id')
+        ).values('total')
+        return super().get_queryset(request).annotate(
+            favorites_count=Coalesce(Subquery(favorites), 0)
+        )
+
+    @display(
+        description='Count recipes in favorites',
+        ordering='favorites_count'
+    )
     def added_in_favorites(self, obj) -> int:
-        return obj.favorite_recipes.count()
+        return getattr(obj, 'favorites_count', 0)
 
 
 @admin.register(foods_models.Ingredient)
 class IngredientAdmin(admin.ModelAdmin):
     list_display = ('name', 'measurement_unit',)
-    list_filter = ('name',)
+    search_fields = ('^name',)
+    show_full_result_count = False
 
 
 @admin.register(foods_models.Tag)
 class TagAdmin(admin.ModelAdmin):
     list_display = ('name', 'color', 'slug',)
+    search_fields = ('name', 'slug')
 
 
 @admin.register(foods_models.ShoppingList)
 class ShoppingListAdmin(admin.ModelAdmin):
-    list_display = ('author', 'recipe',)
+    list_display = ('author', 'recipe', 'servings',)
+    list_select_related = ('author', 'recipe')
+    raw_id_fields = ('author', 'recipe')
+    search_fields = ('author__username',)
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
 
 
 @admin.register(foods_models.Favorite)
 class FavoriteAdmin(admin.ModelAdmin):
     list_display = ('author', 'recipe',)
+    list_select_related = ('author', 'recipe')
+    raw_id_fields = ('author', 'recipe')
+    search_fields = ('author__username',)
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
 
 
 @admin.register(foods_models.RecipeIngredient)
 class RecipeIngredient(admin.ModelAdmin):
     list_display = ('recipe', 'ingredient', 'amount',)
+    list_select_related = ('recipe', 'ingredient')
+    raw_id_fields = ('recipe', 'ingredient')
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+
+
+@admin.register(foods_models.MeasurementUnit)
+class MeasurementUnitAdmin(admin.ModelAdmin):
+    list_display = ('name', 'canonical', 'factor',)
@@ -0,0 +1,38 @@
+from django.core.checks import Error, Tags, register
+from django.db import connections
+
+from .search import SQLiteSearchBackend
+
+
+@register(Tags.database)
+def check_ingredient_fts_triggers(app_configs, databases=None, **kwargs):
+    """Report SQLite databases whose ingredient FTS table is not synced.
+
+    Databases without the table have not been migrated yet and are left
+    to the migration checks.
+    """
+    errors = []
+    table = SQLiteSearchBackend.FTS_TABLE
+    triggers = SQLiteSearchBackend.FTS_TRIGGERS
+    for alias in databases or ():
+        connection = connections[alias]
+        if connection.vendor != 'sqlite':
+            continue
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type IN "
+                "('table', 'trigger') AND name IN (%s)"
+                % ', '.join(['%s'] * (len(triggers) + 1)),
+                [table, *triggers]
+            )
+            found = {row[0] for row in cursor.fetchall()}
+        missing = [name for name in triggers if name not in found]
+        if table in found and missing:
+            errors.append(Error(
+                f'Triggers {", ".join(missing)} of {table} are missing '
+                f'in database {alias!r}, ingredient search is stale.',
+                hint='Recreate them as foods migration 0014 does and '
+                f"run INSERT INTO {table}({table}) VALUES ('rebuild').",
+                id='foods.E001',
+            ))
+    return errors
@@ -0,0 +1,88 @@
+"""Cookbook page rendering with Pillow.
+
+Runs in pool processes started with ``spawn``, so this module must not
+import Django: pages are built from plain dicts and returned as JPEG
+bytes that the parent assembles into a PDF.
+"""
+from io import BytesIO
+
+from PIL import Image, ImageDraw, ImageFont, ImageOps
+
+# A4 at 100 dpi.
+PAGE_SIZE = (827, 1169)
+MARGIN = 60
+PHOTO_SIZE = (PAGE_SIZE[0] - 2 * MARGIN, 420)
+LINE_SPACING = 1.35
+JPEG_QUALITY = 80
+
+
+def _font(path, size):
+    try:
+        return ImageFont.truetype(path, size)
+    except (OSError, TypeError, AttributeError):
+        return ImageFont.load_default(size)
+
+
+def _wrap(draw, text, font, width) -> list:
+    lines = []
+    for paragraph in text.splitlines() or ['']:
+        line = ''
+        for word in paragraph.split():
+            candidate = f'{line} {word}'.strip()
+            if line and draw.textlength(candidate, font=font) > width:
+                lines.append(line)
+                line = word
+            else:
+                line = candidate
+        lines.append(line)
+    return lines
+
+
+def _photo(path):
+    """Open a recipe image downscaled to fit the photo box."""
+    with Image.open(path) as image:
+        image.draft('RGB', PHOTO_SIZE)
+        image = ImageOps.exif_transpose(image).convert('RGB')
+        image.thumbnail(PHOTO_SIZE, Image.Resampling.LANCZOS)
+        return image
+
+
+def render_page(recipe: dict, font_path=None) -> bytes:
+    """Render one recipe page; text that does not fit is cut off."""
+    page = Image.new('RGB', PAGE_SIZE, 'white')
+    draw = ImageDraw.Draw(page)
+    title, body = _font(font_path, 34), _font(font_path, 17)
+    width = PAGE_SIZE[0] - 2 * MARGIN
+    bottom = PAGE_SIZE[1] - MARGIN
+    y = MARGIN
+    for line in _wrap(draw, recipe['name'], title, width):
+        draw.text((MARGIN, y), line, font=title, fill='black')
+        y += int(title.size * LINE_SPACING)
+    y += 10
+    if recipe.get('image_path'):
+        try:
+            photo = _photo(recipe['image_path'])
+        except OSError:
+            photo = None
+        if photo is not None:
+            page.paste(photo, (MARGIN + (width - photo.width) // 2, y))
+            y += photo.height + 20
+    draw.text(
+        (MARGIN, y), f"{recipe['author']} · {recipe['cooking_time']} min",
+        font=body, fill='dimgray'
+    )
+    y += int(body.size * LINE_SPACING * 1.5)
+    lines = [
+        f'• {name}: {amount} {unit}'
+        for name, amount, unit in recipe['ingredients']
+    ]
+    lines += ['']
+    lines += _wrap(draw, recipe['text'], body, width)
+    for line in lines:
+        if y + body.size > bottom:
+            break
+        draw.text((MARGIN, y), line, font=body, fill='black')
+        y += int(body.size * LINE_SPACING)
+    output = BytesIO()
+    page.save(output, 'JPEG', quality=JPEG_QUALITY, optimize=True)
+    return output.getvalue()
@@ -0,0 +1,77 @@
+from django.contrib.auth import get_user_model
+from django.db import router, transaction
+from django.db.models import Count
+
+from api.documents import invalidate_documents
+from foodgram.db import fast_delete
+from jobs.queue import enqueue
+from users.following import invalidate_followed_author_ids
+from users.models import Follow
+from .models import Recipe, RecipeIngredient, RecipeTombstone
+from .tasks import delete_recipe_images
+from .usage import record_ingredient_usage
+
+User = get_user_model()
+
+IMAGE_BATCH_SIZE = 500
+
+
+def delete_recipes(queryset) -> tuple:
+    """Delete recipes set-based instead of through the ORM collector.
+
+    The recipe signal handlers are bypassed, so tombstones and document
+    invalidation happen here for the whole set; image files are removed
+    later by a job once nothing references them.
+    """
+    using = router.db_for_write(Recipe)
+    with transaction.atomic(using=using):
+        recipes = list(queryset.using(using).order_by().values_list(
+            'id', 'image', 'author_id'
+        ))
+        if not recipes:
+            return 0, {}
+        recipe_ids = [pk for pk, _, _ in recipes]
+        usage = dict(RecipeIngredient.objects.using(using).filter(
+            recipe_id__in=recipe_ids
+        ).order_by().values('ingredient_id').annotate(
+            total=Count('id')
+        ).values_list('ingredient_id', 'total'))
+        result = fast_delete(Recipe.objects.filter(id__in=recipe_ids))
+        record_ingredient_usage(
+            {author_id for _, _, author_id in recipes}, removed=usage
+        )
+        RecipeTombstone.objects.using(using).bulk_create(
+            [RecipeTombstone(recipe_id=pk) for pk in recipe_ids],
+            batch_size=IMAGE_BATCH_SIZE, ignore_conflicts=True
+        )
+        invalidate_documents(recipe_ids)
+        images = sorted({image for _, image, _ in recipes if image})
+        for start in range(0, len(images), IMAGE_BATCH_SIZE):
+            enqueue(
+                delete_recipe_images,
+                {'names': images[start:start + IMAGE_BATCH_SIZE]}
+            )
+    return result
+
+
+def delete_users(queryset) -> tuple:
+    """Delete users together with their recipes, set-based."""
+    using = router.db_for_write(User)
+    with transaction.atomic(using=using):
+        user_ids = list(
+            queryset.using(using).order_by().values_list('id', flat=True)
+        )
+        if not user_ids:
+            return 0, {}
+        total, deleted = delete_recipes(
+            Recipe.objects.filter(author_id__in=user_ids)
+        )
+        followers = set(Follow.objects.using(using).filter(
+            author_id__in=user_ids
+        ).values_list('user_id', flat=True))
+        for user_id in followers | set(user_ids):
+            invalidate_followed_author_ids(user_id)
+        count, rest = fast_delete(User.objects.filter(id__in=user_ids))
+    for label, rows in rest.items():
+        deleted[label] = deleted.get(label, 0) + rows
+    return total + count, deleted
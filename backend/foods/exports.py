@@ -0,0 +1,111 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from hashlib import sha256
+from io import BytesIO
+from pathlib import Path
+
+from django.conf import settings
+from django.db.models import Count, Max
+from PIL import Image
+
+from jobs.models import Job
+from .cookbook import PAGE_SIZE, render_page
+from .models import Favorite, Recipe, RecipeIngredient
+
+
+def favorites_version(user) -> str:
+    """Fingerprint of a user's favorites, empty when there are none.
+
+    Adding a favorite raises the largest id, removing one lowers the
+    count and editing a favorited recipe moves ``updated_at``.
+    """
+    state = Favorite.objects.filter(author=user).aggregate(
+        count=Count('id'), last=Max('id'), edited=Max('recipe__updated_at')
+    )
+    if not state['count']:
+        return ''
+    return sha256(
+        f"{state['count']}:{state['last']}:{state['edited']}".encode()
+    ).hexdigest()[:16]
+
+
+def cookbook_path(user_id, version) -> Path:
+    return Path(settings.COOKBOOK_DIR) / str(user_id) / f'{version}.pdf'
+
+
+def export_key(user_id, version) -> str:
+    return f'cookbook:{user_id}:{version}'
+
+
+def export_status(user_id, version):
+    """``ready``, a ``Job.Status`` of the latest export job or None."""
+    if cookbook_path(user_id, version).exists():
+        return 'ready'
+    return Job.objects.filter(
+        dedup_key=export_key(user_id, version)
+    ).order_by('-id').values_list('status', flat=True).first()
+
+
+def _recipes(user_id) -> list:
+    recipes = list(Recipe.objects.filter(
+        favorite_recipes__author_id=user_id
+    ).select_related('author').order_by('name', 'id')[
+        :settings.COOKBOOK_MAX_RECIPES
+    ])
+    ingredients: dict = {}
+    for recipe_id, name, amount, unit in RecipeIngredient.objects.filter(
+        recipe__in=recipes
+    ).order_by('id').values_list(
+        'recipe_id', 'ingredient__name', 'amount',
+        'ingredient__measurement_unit'
+    ):
+        ingredients.setdefault(recipe_id, []).append((name, amount, unit))
+    return [
+        {
+            'name': recipe.name,
+            'author': ' '.join(filter(None, (
+                recipe.author.first_name, recipe.author.last_name
+            ))) or recipe.author.username,
+            'cooking_time': recipe.cooking_time,
+            'text': recipe.text,
+            'ingredients': ingredients.get(recipe.id, []),
+            'image_path': recipe.image.path if recipe.image else None,
+        }
+        for recipe in recipes
+    ]
+
+
+def build_cookbook(user_id, version) -> Path:
+    """Render the favorites of a user to a PDF in COOKBOOK_DIR.
+
+    Pages are rendered by a pool of COOKBOOK_PROCESSES processes so the
+    CPU-bound work neither holds the GIL of the job worker nor runs in
+    a web worker. Older cookbooks of the user are removed.
+    """
+    path = cookbook_path(user_id, version)
+    recipes = _recipes(user_id)
+    # ``spawn`` children do not inherit the worker's threads and
+    # database connections.
+    with ProcessPoolExecutor(
+        max_workers=settings.COOKBOOK_PROCESSES,
+        mp_context=multiprocessing.get_context('spawn')
+    ) as pool:
+        pages = [
+            Image.open(BytesIO(page)) for page in pool.map(
+                partial(render_page, font_path=settings.COOKBOOK_FONT),
+                recipes, chunksize=8
+            )
+        ] or [Image.new('RGB', PAGE_SIZE, 'white')]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_suffix('.tmp')
+    pages[0].save(
+        temporary, 'PDF', save_all=True, append_images=pages[1:],
+        resolution=100
+    )
+    os.replace(temporary, path)
+    for stale in path.parent.glob('*.pdf'):
+        if stale != path:
+            stale.unlink(missing_ok=True)
+    return path
@@ -1,8 +1,8 @@
 import django_filters
 from django_filters import rest_framework as filters
-from django.contrib.postgres.search import SearchVector, TrigramSimilarity
 
 from .models import Recipe, Tag, Ingredient
+from .search import search_ingredients
 
 
 class IngredientFilter(django_filters.FilterSet):
@@ -14,21 +14,28 @@ class IngredientFilter(django_filters.FilterSet):
 
     def filter_name(self, queryset, name, value):
         if value:
-            q = value.lower()
-            vector = SearchVector('name')
-            vector_trgm = TrigramSimilarity(
-                'name', q, raw=True, fields=('name')
-            )
-            return queryset.annotate(
-                search=vector
-            ).order_by('name').filter(
-                search=q
-            ) or queryset.annotate(
-                similarity=vector_trgm
-            ).filter(similarity__gt=0.3).order_by('name')
+            return search_ingredients(queryset, value)
         return queryset
 
 
+class StableOrderingFilter(filters.OrderingFilter):
+    """Break ties on ``id`` so pages are stable and match the indexes.
+
+    The tiebreak runs against the ordering direction, so both directions
+    are a forward or backward scan of a ``(field, -id)`` index.
+    """
+
+    def filter(self, qs, value):
+        ordering = self.get_ordering_value(value[-1]) if value else None
+        qs = super().filter(qs, value)
+        if ordering:
+            qs = qs.order_by(
+                *qs.query.order_by,
+                'id' if ordering.startswith('-') else '-id'
+            )
+        return qs
+
+
 class RecipeFilter(filters.FilterSet):
     is_favorited = filters.NumberFilter(
         field_name='favorite_recipes', method='filter_is_favorited'
@@ -44,9 +51,16 @@ class RecipeFilter(filters.FilterSet):
         queryset=Tag.objects.all(),
     )
 
+    ordering = StableOrderingFilter(fields=('cooking_time',))
+
     class Meta:
         model = Recipe
-        fields = ['author', 'tags']
+        fields = {
+            'author': ['exact'],
+            'tags': ['exact'],
+            'cooking_time': ['lte', 'gte'],
+            'ingredients_count': ['lte', 'gte'],
+        }
 
     def filter_is_favorited(self, queryset, name, value):
         user = self.request.user
@@ -0,0 +1,102 @@
+import json
+from itertools import islice
+
+from django.db import transaction
+
+from api.serializers import IngestRecipeSerializer
+from jobs.queue import enqueue
+from .models import Recipe, RecipeIngredient
+from .reference import ingredient_references, tag_references
+from .usage import record_ingredient_usage
+from .tasks import attach_recipe_image
+
+INGEST_BATCH_SIZE = 500
+
+
+def _parse(lines):
+    for number, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', errors='replace')
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError as error:
+            yield number, error
+
+
+def _validate(rows):
+    valid, report = [], []
+    context = {
+        'tags': tag_references.rows(),
+        'ingredients': ingredient_references.rows(),
+    }
+    for number, data in rows:
+        if isinstance(data, ValueError):
+            report.append({
+                'line': number, 'status': 'error',
+                'errors': {'json': [str(data)]}
+            })
+            continue
+        serializer = IngestRecipeSerializer(data=data, context=context)
+        if serializer.is_valid():
+            valid.append((number, serializer.validated_data))
+        else:
+            report.append({
+                'line': number, 'status': 'error',
+                'errors': serializer.errors
+            })
+    return valid, report
+
+
+@transaction.atomic
+def _store(author, valid) -> list:
+    recipes = Recipe.objects.bulk_create([
+        Recipe(
+            author=author, name=data['name'], text=data['text'],
+            cooking_time=data['cooking_time'], image='',
+            ingredients_count=len(data['ingredients'])
+        )
+        for _, data in valid
+    ])
+    Recipe.tags.through.objects.bulk_create([
+        Recipe.tags.through(recipe_id=recipe.id, tag_id=tag_id)
+        for recipe, (_, data) in zip(recipes, valid)
+        for tag_id in data['tags']
+    ])
+    RecipeIngredient.objects.bulk_create([
+        RecipeIngredient(
+            recipe_id=recipe.id, ingredient_id=ingredient['id'],
+            amount=ingredient['amount']
+        )
+        for recipe, (_, data) in zip(recipes, valid)
+        for ingredient in data['ingredients']
+    ])
+    record_ingredient_usage([author.id], added=[
+        ingredient['id'] for _, data in valid
+        for ingredient in data['ingredients']
+    ])
+    for recipe, (_, data) in zip(recipes, valid):
+        if data.get('image'):
+            enqueue(attach_recipe_image, {
+                'recipe_id': recipe.id, 'source': data['image']
+            })
+    return [
+        {'line': number, 'status': 'created', 'id': recipe.id}
+        for recipe, (number, _) in zip(recipes, valid)
+    ]
+
+
+def ingest(author, lines, batch_size=INGEST_BATCH_SIZE):
+    """Create recipes of ``author`` from NDJSON lines, batch by batch.
+
+    Every batch is validated against the in-memory tag and ingredient
+    maps and stored in its own transaction, so a bad row never blocks
+    the others. Yields one report entry per non-empty line.
+    """
+    rows = _parse(lines)
+    while batch := list(islice(rows, batch_size)):
+        valid, report = _validate(batch)
+        if valid:
+            report += _store(author, valid)
+        yield from sorted(report, key=lambda entry: entry['line'])
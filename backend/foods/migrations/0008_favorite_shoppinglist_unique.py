@@ -0,0 +1,34 @@
+# Generated by Django 5.0.4 on 2026-10-19 10:11
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def remove_duplicates(apps, schema_editor):
+    for model_name in ('Favorite', 'ShoppingList'):
+        model = apps.get_model('foods', model_name)
+        keep = model.objects.values('author', 'recipe').annotate(
+            keep_id=Min('id')
+        ).values('keep_id')
+        model.objects.exclude(id__in=keep).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foods', '0007_alter_favorite_options_alter_ingredient_options_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='favorite',
+            constraint=models.UniqueConstraint(fields=('author', 'recipe'), name='unique favorite'),
+        ),
+        migrations.AddConstraint(
+            model_name='shoppinglist',
+            constraint=models.UniqueConstraint(fields=('author', 'recipe'), name='unique shoppinglist'),
+        ),
+    ]
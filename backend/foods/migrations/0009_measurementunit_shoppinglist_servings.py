@@ -0,0 +1,53 @@
+# Generated by Django 5.0.4 on 2026-10-19 10:13
+
+import django.core.validators
+from decimal import Decimal
+
+from django.db import migrations, models
+
+UNITS = (
+    ('г', 'г', Decimal('1')),
+    ('кг', 'г', Decimal('1000')),
+    ('мг', 'г', Decimal('0.001')),
+    ('мл', 'мл', Decimal('1')),
+    ('л', 'мл', Decimal('1000')),
+    ('ч. л.', 'мл', Decimal('5')),
+    ('ст. л.', 'мл', Decimal('15')),
+    ('стакан', 'мл', Decimal('250')),
+)
+
+
+def create_units(apps, schema_editor):
+    MeasurementUnit = apps.get_model('foods', 'MeasurementUnit')
+    MeasurementUnit.objects.bulk_create([
+        MeasurementUnit(name=name, canonical=canonical, factor=factor)
+        for name, canonical, factor in UNITS
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foods', '0008_favorite_shoppinglist_unique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MeasurementUnit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=16, unique=True, verbose_name='Measure of unit')),
+                ('canonical', models.CharField(max_length=16, verbose_name='Canonical measure of unit')),
+                ('factor', models.DecimalField(decimal_places=6, max_digits=12, verbose_name='Amount of canonical units in one unit')),
+            ],
+            options={
+                'ordering': ['canonical', 'factor'],
+            },
+        ),
+        migrations.RunPython(create_units, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='shoppinglist',
+            name='servings',
+            field=models.PositiveSmallIntegerField(db_default=1, default=1, validators=[django.core.validators.MinValueValidator(limit_value=1, message='Servings cant be less than 1'), django.core.validators.MaxValueValidator(limit_value=100, message='Servings cant be more than 100')], verbose_name='Scale factor for recipe amounts'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.4 on 2026-10-19 10:22
+
+import foods.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foods', '0010_recipe_timestamps_tombstones'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='recipe',
+            name='image',
+            field=models.ImageField(storage=foods.storage.recipe_image_storage, upload_to='recipes/images/', verbose_name='Image for recipe'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.0.4 on 2026-10-19 10:33
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_ingredients(apps, schema_editor):
+    Recipe = apps.get_model('foods', 'Recipe')
+    RecipeIngredient = apps.get_model('foods', 'RecipeIngredient')
+    counts = RecipeIngredient.objects.filter(
+        recipe=OuterRef('pk')
+    ).order_by().values('recipe').annotate(total=Count('id')).values('total')
+    Recipe.objects.update(ingredients_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foods', '0011_recipe_image_storage'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='ingredients_count',
+            field=models.PositiveSmallIntegerField(db_default=0, default=0, verbose_name='Number of ingredients'),
+        ),
+        migrations.RunPython(count_ingredients, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['cooking_time', '-id'], name='recipe_cooking_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['ingredients_count', '-id'], name='recipe_ingredients_count_idx'),
+        ),
+    ]
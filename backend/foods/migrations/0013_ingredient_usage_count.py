@@ -0,0 +1,36 @@
+# Generated by Django 5.0.4 on 2026-10-19 10:36
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_usage(apps, schema_editor):
+    Ingredient = apps.get_model('foods', 'Ingredient')
+    RecipeIngredient = apps.get_model('foods', 'RecipeIngredient')
+    counts = RecipeIngredient.objects.filter(
+        ingredient=OuterRef('pk')
+    ).order_by().values('ingredient').annotate(
+        total=Count('id')
+    ).values('total')
+    Ingredient.objects.update(usage_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foods', '0012_recipe_ingredients_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingredient',
+            name='usage_count',
+            field=models.PositiveIntegerField(db_default=0, default=0, verbose_name='Number of recipes using it'),
+        ),
+        migrations.RunPython(count_usage, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='ingredient',
+            index=models.Index(fields=['-usage_count', 'name'], name='ingredient_usage_idx'),
+        ),
+    ]
@@ -0,0 +1,65 @@
+from django.db import migrations
+
+# The expression SearchVector('name', config='simple') compiles to, so
+# PostgresSearchBackend queries can use the index.
+POSTGRES_FORWARD = (
+    'CREATE INDEX IF NOT EXISTS ingredient_name_search_idx '
+    'ON foods_ingredient USING gin '
+    "(to_tsvector('simple'::regconfig, COALESCE(name, '')))",
+)
+POSTGRES_BACKWARD = (
+    'DROP INDEX IF EXISTS ingredient_name_search_idx',
+)
+
+SQLITE_FORWARD = (
+    "CREATE VIRTUAL TABLE foods_ingredient_fts USING fts5("
+    "name, content='foods_ingredient', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    'CREATE TRIGGER foods_ingredient_fts_insert AFTER INSERT '
+    'ON foods_ingredient BEGIN '
+    'INSERT INTO foods_ingredient_fts(rowid, name) '
+    'VALUES (new.id, new.name); END',
+    'CREATE TRIGGER foods_ingredient_fts_delete AFTER DELETE '
+    'ON foods_ingredient BEGIN '
+    'INSERT INTO foods_ingredient_fts(foods_ingredient_fts, rowid, name) '
+    "VALUES ('delete', old.id, old.name); END",
+    'CREATE TRIGGER foods_ingredient_fts_update AFTER UPDATE OF name '
+    'ON foods_ingredient BEGIN '
+    'INSERT INTO foods_ingredient_fts(foods_ingredient_fts, rowid, name) '
+    "VALUES ('delete', old.id, old.name); "
+    'INSERT INTO foods_ingredient_fts(rowid, name) '
+    'VALUES (new.id, new.name); END',
+    'INSERT INTO foods_ingredient_fts(foods_ingredient_fts) '
+    "VALUES ('rebuild')",
+)
+SQLITE_BACKWARD = (
+    'DROP TRIGGER IF EXISTS foods_ingredient_fts_update',
+    'DROP TRIGGER IF EXISTS foods_ingredient_fts_delete',
+    'DROP TRIGGER IF EXISTS foods_ingredient_fts_insert',
+    'DROP TABLE IF EXISTS foods_ingredient_fts',
+)
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, ()):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foods', '0013_ingredient_usage_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({
+                'postgresql': POSTGRES_FORWARD, 'sqlite': SQLITE_FORWARD
+            }),
+            _run({
+                'postgresql': POSTGRES_BACKWARD, 'sqlite': SQLITE_BACKWARD
+            }),
+        ),
+    ]
@@ -3,6 +3,9 @@ from django.core.validators import MinValueValidator, MaxValueValidator
 from django.conf import settings
 from django.core.exceptions import ValidationError
 
+from foodgram.db import delete_link, insert_link
+from .storage import recipe_image_storage
+
 
 class Tag(models.Model):
     name = models.CharField(
@@ -27,14 +30,41 @@ class Ingredient(models.Model):
     measurement_unit = models.CharField(
         max_length=16, verbose_name='Measure of unit'
     )
+    usage_count = models.PositiveIntegerField(
+        default=0, db_default=0, verbose_name='Number of recipes using it'
+    )
 
     class Meta:
         ordering = ['-id']
+        indexes = [
+            models.Index(
+                fields=['-usage_count', 'name'], name='ingredient_usage_idx'
+            ),
+        ]
 
     def __str__(self) -> str:
         return f'{self.name} |-| {self.measurement_unit}'
 
 
+class MeasurementUnit(models.Model):
+    name = models.CharField(
+        max_length=16, unique=True, verbose_name='Measure of unit'
+    )
+    canonical = models.CharField(
+        max_length=16, verbose_name='Canonical measure of unit'
+    )
+    factor = models.DecimalField(
+        max_digits=12, decimal_places=6,
+        verbose_name='Amount of canonical units in one unit'
+    )
+
+    class Meta:
+        ordering = ['canonical', 'factor']
+
+    def __str__(self) -> str:
+        return f'{self.name} |-| {self.factor} {self.canonical}'
+
+
 class Recipe(models.Model):
     author = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -53,6 +83,7 @@ class Recipe(models.Model):
     )
     image = models.ImageField(
         upload_to='recipes/images/',
+        storage=recipe_image_storage,
         verbose_name='Image for recipe'
     )
     name = models.CharField(
@@ -72,9 +103,31 @@ class Recipe(models.Model):
                 message='Time of cooking cant be more than 32 000 minutes'
             )
         ], verbose_name='Time of cooking recipe in minutes')
+    ingredients_count = models.PositiveSmallIntegerField(
+        default=0, db_default=0, verbose_name='Number of ingredients'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True, verbose_name='Created at'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True, verbose_name='Updated at'
+    )
 
     class Meta:
         ordering = ['-id']
+        indexes = [
+            models.Index(
+                fields=['updated_at', 'id'], name='recipe_updated_idx'
+            ),
+            models.Index(
+                fields=['cooking_time', '-id'],
+                name='recipe_cooking_time_idx'
+            ),
+            models.Index(
+                fields=['ingredients_count', '-id'],
+                name='recipe_ingredients_count_idx'
+            ),
+        ]
 
     def clean(self):
         tags = self.tags.all()
@@ -88,6 +141,27 @@ class Recipe(models.Model):
         return self.name
 
 
+class RecipeTombstone(models.Model):
+    recipe_id = models.BigIntegerField(
+        unique=True, verbose_name='Id of deleted recipe'
+    )
+    deleted_at = models.DateTimeField(
+        auto_now_add=True, verbose_name='Deleted at'
+    )
+
+    class Meta:
+        ordering = ['-id']
+        indexes = [
+            models.Index(
+                fields=['deleted_at', 'recipe_id'],
+                name='recipe_tombstone_idx'
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.recipe_id} |-| {self.deleted_at}'
+
+
 class RecipeIngredient(models.Model):
     recipe = models.ForeignKey(
         Recipe, on_delete=models.CASCADE,
@@ -115,7 +189,20 @@ class RecipeIngredient(models.Model):
         ordering = ['-id']
 
     def __str__(self) -> str:
-        return f'{self.author} |-| {self.recipe} |-| {self.amount}'
+        return f'{self.recipe} |-| {self.ingredient} |-| {self.amount}'
+
+
+class UserRecipeQuerySet(models.QuerySet):
+    def add(self, author, recipe_id, **values) -> bool:
+        return insert_link(
+            self.model, 'author', author.id, 'recipe', recipe_id,
+            values=values
+        )
+
+    def discard(self, author, recipe_id) -> bool:
+        return delete_link(
+            self.model, 'author', author.id, 'recipe', recipe_id
+        )
 
 
 class Favorite(models.Model):
@@ -130,8 +217,16 @@ class Favorite(models.Model):
         on_delete=models.CASCADE
     )
 
+    objects = UserRecipeQuerySet.as_manager()
+
     class Meta:
         ordering = ['-id']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['author', 'recipe'],
+                name='unique %(class)s'
+            )
+        ]
 
     def __str__(self) -> str:
         return f'{self.author} |-| {self.recipe}'
@@ -149,9 +244,31 @@ class ShoppingList(models.Model):
         related_name='shopping_list_recipes', verbose_name='Recipe',
         on_delete=models.CASCADE
     )
+    servings = models.PositiveSmallIntegerField(
+        default=1, db_default=1,
+        validators=[
+            MinValueValidator(
+                limit_value=settings.CONSTANTS.get('MIN_SERVINGS'),
+                message='Servings cant be less than 1'
+            ),
+            MaxValueValidator(
+                limit_value=settings.CONSTANTS.get('MAX_SERVINGS'),
+                message='Servings cant be more than 100'
+            )
+        ],
+        verbose_name='Scale factor for recipe amounts'
+    )
+
+    objects = UserRecipeQuerySet.as_manager()
 
     class Meta:
         ordering = ['-id']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['author', 'recipe'],
+                name='unique %(class)s'
+            )
+        ]
 
     def __str__(self) -> str:
         return f'{self.author} |-| {self.recipe}'
@@ -0,0 +1,76 @@
+from threading import Lock
+from time import monotonic
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Ingredient, Tag
+
+
+class ReferenceCache:
+    """Per-process id-keyed copy of a rarely changing table.
+
+    Rows are reloaded only when the version stamp kept in the shared
+    cache changes or when the local copy is older than
+    ``REFERENCE_CACHE_TTL`` seconds. Rows are looked up once per tag and
+    ingredient of a response, so the stamp itself is re-read at most
+    every ``REFERENCE_VERSION_INTERVAL`` seconds.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.version_key = (
+            f'foods:reference:{model._meta.model_name}:version'
+        )
+        self._rows: dict = {}
+        self._version = None
+        self._loaded_at: float = 0.0
+        self._seen_version = None
+        self._checked_at: float = 0.0
+        self._lock = Lock()
+
+    def _current_version(self) -> str:
+        now = monotonic()
+        if (self._seen_version is not None and now - self._checked_at
+                < settings.REFERENCE_VERSION_INTERVAL):
+            return self._seen_version
+        version = cache.get(self.version_key)
+        if version is None:
+            cache.add(self.version_key, uuid4().hex, None)
+            version = cache.get(self.version_key)
+        self._seen_version, self._checked_at = version, now
+        return version
+
+    def _is_fresh(self, version) -> bool:
+        return (
+            version == self._version
+            and monotonic() - self._loaded_at < settings.REFERENCE_CACHE_TTL
+        )
+
+    def rows(self) -> dict:
+        version = self._current_version()
+        if self._is_fresh(version):
+            return self._rows
+        with self._lock:
+            if not self._is_fresh(version):
+                self._rows = self.model.objects.in_bulk()
+                self._version = version
+                self._loaded_at = monotonic()
+        return self._rows
+
+    def get(self, pk):
+        return self.rows().get(pk)
+
+    def get_many(self, pks) -> dict:
+        rows = self.rows()
+        return {pk: rows[pk] for pk in pks if pk in rows}
+
+    def invalidate(self) -> None:
+        cache.set(self.version_key, uuid4().hex, None)
+        # The writing process sees its own change immediately.
+        self._seen_version = None
+
+
+tag_references = ReferenceCache(Tag)
+ingredient_references = ReferenceCache(Ingredient)
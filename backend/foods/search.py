@@ -0,0 +1,124 @@
+"""Ingredient name search, implemented per database backend.
+
+Each query word has to start a word of the name and the first one has
+to start the name itself, which is what autocompletion expects. The
+indexes used here are created by migration 0014 for the backend in use.
+"""
+import re
+
+from django.conf import settings
+from django.db import connections
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from .usage import INGREDIENT_RANKING
+
+WORD = re.compile(r'\w+')
+TRIGRAM_THRESHOLD = 0.3
+
+
+def _words(query) -> list:
+    return WORD.findall(query.lower())
+
+
+class SearchBackend:
+    """Portable ``LIKE`` search for other databases.
+
+    Not indexed, and whether non-ASCII letters are case folded depends
+    on the database.
+    """
+
+    def search(self, queryset, query):
+        words = _words(query)
+        if not words:
+            return queryset.none()
+        queryset = queryset.filter(name__istartswith=words[0])
+        for word in words[1:]:
+            queryset = queryset.filter(name__icontains=word)
+        return queryset.order_by(*INGREDIENT_RANKING)
+
+
+class PostgresSearchBackend(SearchBackend):
+    """Prefix full-text search, trigram similarity when nothing matches.
+
+    Matches come from the GIN index ``ingredient_name_search_idx`` on
+    ``to_tsvector('simple', name)``.
+    """
+
+    def search(self, queryset, query):
+        from django.contrib.postgres.search import (
+            SearchQuery, SearchVector, TrigramSimilarity
+        )
+        words = _words(query)
+        if not words:
+            return queryset.none()
+        matches = queryset.annotate(
+            search=SearchVector('name', config='simple')
+        ).filter(
+            search=SearchQuery(
+                ' & '.join(f'{word}:*' for word in words),
+                search_type='raw', config='simple'
+            ),
+            name__istartswith=words[0]
+        ).order_by(*INGREDIENT_RANKING)
+        # exists() instead of truthiness, which would fetch every match
+        # and hand back an evaluated queryset.
+        if matches.exists():
+            return matches
+        return queryset.annotate(
+            similarity=TrigramSimilarity('name', query.lower())
+        ).filter(
+            similarity__gt=TRIGRAM_THRESHOLD
+        ).order_by(*INGREDIENT_RANKING)
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """FTS5 search over the external-content table ``FTS_TABLE``.
+
+    Triggers on ``foods_ingredient`` keep the table in sync. Django
+    rebuilds SQLite tables for most schema changes, which drops them,
+    so migrations altering ``Ingredient`` have to recreate them; the
+    ``foods.E001`` check reports when they are missing.
+    """
+
+    FTS_TABLE = 'foods_ingredient_fts'
+    FTS_TRIGGERS = (
+        'foods_ingredient_fts_insert',
+        'foods_ingredient_fts_delete',
+        'foods_ingredient_fts_update',
+    )
+
+    @staticmethod
+    def _phrase(word) -> str:
+        return '"{}"*'.format(word.replace('"', '""'))
+
+    def search(self, queryset, query):
+        words = _words(query)
+        if not words:
+            return queryset.none()
+        # ``^`` anchors the first phrase to the start of the name.
+        match = ' '.join(
+            ['^' + self._phrase(words[0])]
+            + [self._phrase(word) for word in words[1:]]
+        )
+        return queryset.filter(id__in=RawSQL(
+            f'SELECT rowid FROM {self.FTS_TABLE} '
+            f'WHERE {self.FTS_TABLE} MATCH %s', (match,)
+        )).order_by(*INGREDIENT_RANKING)
+
+
+BACKENDS = {
+    'postgresql': PostgresSearchBackend,
+    'sqlite': SQLiteSearchBackend,
+}
+
+
+def search_backend(using='default') -> SearchBackend:
+    """SEARCH_BACKEND if set, otherwise the one for the database."""
+    if settings.SEARCH_BACKEND:
+        return import_string(settings.SEARCH_BACKEND)()
+    return BACKENDS.get(connections[using].vendor, SearchBackend)()
+
+
+def search_ingredients(queryset, query):
+    return search_backend(queryset.db).search(queryset, query)
@@ -0,0 +1,100 @@
+from django.conf import settings
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_save, pre_delete
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from api.documents import invalidate_documents
+from jobs.queue import enqueue
+from .models import (
+    Ingredient, Recipe, RecipeIngredient, RecipeTombstone, Tag
+)
+from .reference import ingredient_references, tag_references
+from .tasks import refresh_recipe_documents
+
+AUTHOR_DOCUMENT_FIELDS = {
+    'email', 'username', 'first_name', 'last_name'
+}
+
+
+def rebuild_documents_later(recipe_ids, dedup_key) -> None:
+    recipe_ids = list(recipe_ids)
+    invalidate_documents(recipe_ids)
+    if recipe_ids:
+        Recipe.objects.filter(id__in=recipe_ids).update(
+            updated_at=timezone.now()
+        )
+        enqueue(
+            refresh_recipe_documents, {'recipe_ids': recipe_ids},
+            dedup_key=dedup_key
+        )
+
+
+@receiver([post_save, post_delete], sender=Tag)
+def invalidate_tag_references(sender, instance, **kwargs):
+    tag_references.invalidate()
+
+
+@receiver(post_save, sender=Tag)
+def rebuild_tag_documents(sender, instance, **kwargs):
+    rebuild_documents_later(
+        instance.recipes.values_list('id', flat=True),
+        f'documents:tag:{instance.id}'
+    )
+
+
+@receiver(pre_delete, sender=Tag)
+def invalidate_tag_documents(sender, instance, **kwargs):
+    invalidate_documents(
+        instance.recipes.values_list('id', flat=True)
+    )
+
+
+@receiver([post_save, post_delete], sender=Ingredient)
+def invalidate_ingredient_references(sender, instance, **kwargs):
+    ingredient_references.invalidate()
+
+
+@receiver(post_save, sender=Ingredient)
+def rebuild_ingredient_documents(sender, instance, created, **kwargs):
+    if not created:
+        rebuild_documents_later(
+            instance.recipe_ingredients.values_list('recipe_id', flat=True),
+            f'documents:ingredient:{instance.id}'
+        )
+
+
+@receiver([post_save, post_delete], sender=Recipe)
+def invalidate_recipe_document(sender, instance, **kwargs):
+    invalidate_documents([instance.id])
+
+
+@receiver(post_delete, sender=Recipe)
+def create_recipe_tombstone(sender, instance, **kwargs):
+    RecipeTombstone.objects.create(recipe_id=instance.id)
+
+
+@receiver([post_save, post_delete], sender=RecipeIngredient)
+def invalidate_recipe_ingredient_document(sender, instance, **kwargs):
+    invalidate_documents([instance.recipe_id])
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def invalidate_recipe_tags_document(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if action == 'pre_clear' and reverse:
+        invalidate_documents(instance.recipes.values_list('id', flat=True))
+    elif action in {'post_add', 'post_remove', 'post_clear'}:
+        invalidate_documents([instance.id] if not reverse else pk_set or [])
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_author_documents(sender, instance, update_fields, **kwargs):
+    if update_fields and not AUTHOR_DOCUMENT_FIELDS & set(update_fields):
+        return
+    rebuild_documents_later(
+        instance.recipes.values_list('id', flat=True),
+        f'documents:author:{instance.id}'
+    )
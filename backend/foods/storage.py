@@ -0,0 +1,85 @@
+import os
+import posixpath
+import tempfile
+from hashlib import sha256
+
+from django.core.files.storage import FileSystemStorage
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Store files under the SHA-256 of their content.
+
+    ``dir/name.ext`` is saved as ``dir/ab/abcdef....ext``; an identical
+    upload resolves to the existing file, so names never change meaning
+    and can be cached forever.
+    """
+
+    def save(self, name, content, max_length=None):
+        digest = sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        directory, filename = posixpath.split(str(name).replace('\\', '/'))
+        extension = posixpath.splitext(filename)[1].lower()
+        name = posixpath.join(
+            directory, digest.hexdigest()[:2],
+            digest.hexdigest() + extension
+        )
+        return super().save(name, content, max_length)
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def _save(self, name, content):
+        full_path = self.path(name)
+        try:
+            # Restart the grace period of gc_media, which could otherwise
+            # collect an old orphan right after this upload reused it.
+            os.utime(full_path)
+        except FileNotFoundError:
+            pass
+        else:
+            return name
+        directory = os.path.dirname(full_path)
+        os.makedirs(directory, exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(descriptor, 'wb') as file:
+                for chunk in content.chunks():
+                    file.write(chunk)
+            os.chmod(temporary, self.file_permissions_mode or 0o644)
+            # Concurrent uploads of the same content write equal bytes,
+            # so whichever rename lands last is fine.
+            os.replace(temporary, full_path)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+        return name
+
+
+def recipe_image_storage():
+    return ContentAddressedStorage()
+
+
+def delete_unreferenced(names) -> list:
+    """Delete image files no recipe points at; return deleted names.
+
+    Content-addressed files may be shared by several recipes, so a file
+    is only removed once the last reference to it is gone.
+    """
+    from .models import Recipe
+
+    names = set(names)
+    referenced = set(Recipe.objects.filter(
+        image__in=names
+    ).values_list('image', flat=True))
+    storage = recipe_image_storage()
+    deleted = []
+    for name in names - referenced:
+        if storage.exists(name):
+            storage.delete(name)
+            deleted.append(name)
+    return deleted
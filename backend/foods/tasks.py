@@ -0,0 +1,147 @@
+import base64
+import ipaddress
+import socket
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.core.files.base import ContentFile
+from django.utils import timezone
+
+from api.documents import invalidate_documents, refresh_documents
+from api.serializers import Base64ImageField
+from jobs.queue import enqueue, task
+from .exports import build_cookbook, export_key
+from .models import Recipe
+from .storage import delete_unreferenced, recipe_image_storage
+
+IMAGE_DOWNLOAD_TIMEOUT = 30
+IMAGE_MAX_SIZE = 10 * 1024 * 1024
+IMAGE_MAX_REDIRECTS = 3
+IMAGE_URL_SCHEMES = ('http', 'https')
+
+
+@task()
+def refresh_recipe_documents(recipe_ids):
+    refresh_documents(recipe_ids)
+
+
+@task()
+def delete_recipe_images(names):
+    delete_unreferenced(names)
+
+
+class PinnedAddressAdapter(HTTPAdapter):
+    """Keep the URL's host name for SNI and certificate checks.
+
+    Requests go to an IP address, so TLS would otherwise verify the
+    certificate against that address.
+    """
+
+    def __init__(self, hostname, **kwargs):
+        self.hostname = hostname
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs.update(server_hostname=self.hostname,
+                      assert_hostname=self.hostname)
+        super().init_poolmanager(*args, **kwargs)
+
+
+def _public_address(url) -> str:
+    """Resolve the host of ``url`` to the address to connect to.
+
+    Every address the host resolves to has to be public, so neither
+    loopback, private and link-local ranges (cloud metadata) nor
+    multicast can be requested on behalf of a client.
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in IMAGE_URL_SCHEMES or not parts.hostname:
+        raise ValueError(f'Not an http(s) URL: {url}')
+    addresses = [
+        ipaddress.ip_address(address[0])
+        for *_, address in socket.getaddrinfo(
+            parts.hostname, parts.port, proto=socket.IPPROTO_TCP
+        )
+    ]
+    for ip in addresses:
+        if not ip.is_global or ip.is_multicast:
+            raise ValueError(
+                f'{parts.hostname} resolves to non-public address {ip}'
+            )
+    return str(addresses[0])
+
+
+def _get(session, url):
+    """GET ``url`` from the address vetted for it.
+
+    Letting the connection resolve the name again would allow a second
+    DNS answer pointing inside the network (DNS rebinding).
+    """
+    address = _public_address(url)
+    parts = urlsplit(url)
+    host = f'[{address}]' if ':' in address else address
+    name = f'[{parts.hostname}]' if ':' in parts.hostname else parts.hostname
+    if parts.port:
+        host, name = f'{host}:{parts.port}', f'{name}:{parts.port}'
+    session.mount(
+        f'{parts.scheme}://', PinnedAddressAdapter(parts.hostname)
+    )
+    return session.get(
+        urlunsplit(parts._replace(netloc=host)), headers={'Host': name},
+        timeout=IMAGE_DOWNLOAD_TIMEOUT, stream=True, allow_redirects=False
+    )
+
+
+def _fetch_image(source) -> ContentFile:
+    if source.startswith('data:image'):
+        header, data = source.split(';base64,')
+        return ContentFile(
+            base64.b64decode(data), name='image.' + header.split('/')[-1]
+        )
+    url = source
+    with requests.Session() as session:
+        # Redirects are followed by hand so that every hop is checked.
+        for _ in range(IMAGE_MAX_REDIRECTS + 1):
+            with _get(session, url) as response:
+                if response.is_redirect:
+                    url = urljoin(url, response.headers['location'])
+                    continue
+                response.raise_for_status()
+                content = response.raw.read(
+                    IMAGE_MAX_SIZE + 1, decode_content=True
+                )
+            break
+        else:
+            raise ValueError(f'More than {IMAGE_MAX_REDIRECTS} redirects')
+    if len(content) > IMAGE_MAX_SIZE:
+        raise ValueError(f'Image larger than {IMAGE_MAX_SIZE} bytes')
+    return ContentFile(content, name=urlsplit(url).path.rsplit('/')[-1])
+
+
+@task()
+def attach_recipe_image(recipe_id, source):
+    image = Base64ImageField().to_internal_value(_fetch_image(source))
+    # Named after the format Pillow detected, not what the URL claims.
+    filename = 'image.' + image.content_type.split('/')[-1]
+    name = recipe_image_storage().save(
+        Recipe.image.field.generate_filename(None, filename), image
+    )
+    if Recipe.objects.filter(id=recipe_id).update(
+        image=name, updated_at=timezone.now()
+    ):
+        invalidate_documents([recipe_id])
+    else:
+        delete_unreferenced([name])
+
+
+@task()
+def export_cookbook(user_id, version):
+    build_cookbook(user_id, version)
+
+
+def schedule_cookbook_export(user_id, version) -> None:
+    enqueue(
+        export_cookbook, {'user_id': user_id, 'version': version},
+        dedup_key=export_key(user_id, version)
+    )
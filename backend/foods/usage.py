@@ -0,0 +1,72 @@
+from collections import Counter, defaultdict
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Ingredient, RecipeIngredient
+
+INGREDIENT_RANKING = ('-usage_count', 'name')
+USER_USAGE_KEY = 'foods:ingredient-usage:{}'
+USER_USAGE_TIMEOUT = 60 * 60
+
+
+def record_ingredient_usage(author_ids, removed=(), added=()) -> None:
+    """Apply ingredient usage changes of recipes by ``author_ids``.
+
+    ``removed`` and ``added`` are ingredient ids or id -> count mappings;
+    counts are adjusted with one UPDATE per distinct delta.
+    """
+    delta = Counter(added)
+    delta.subtract(Counter(removed))
+    by_change = defaultdict(list)
+    for pk, change in delta.items():
+        if change:
+            by_change[change].append(pk)
+    for change, pks in by_change.items():
+        Ingredient.objects.filter(id__in=pks).update(
+            usage_count=Greatest(F('usage_count') + change, 0)
+        )
+    keys = [USER_USAGE_KEY.format(pk) for pk in author_ids]
+    if keys:
+        transaction.on_commit(partial(cache.delete_many, keys))
+
+
+def user_ingredient_usage(user) -> dict:
+    """Ingredient id -> number of the user's recipes using it."""
+    if not user.is_authenticated:
+        return {}
+    key = USER_USAGE_KEY.format(user.pk)
+    # Recipes change in other workers and in ingest_recipes, whose
+    # invalidations only reach a shared cache.
+    usage = cache.get(key) if settings.SHARED_CACHE else None
+    if usage is None:
+        usage = dict(RecipeIngredient.objects.filter(
+            recipe__author=user
+        ).order_by().values('ingredient_id').annotate(
+            total=Count('id')
+        ).values_list('ingredient_id', 'total'))
+        if settings.SHARED_CACHE:
+            cache.set(key, usage, USER_USAGE_TIMEOUT)
+    return usage
+
+
+def rank_for_user(ingredients, user) -> list:
+    """Move the user's own ingredients first, keeping the global order."""
+    ingredients = list(ingredients)
+    usage = user_ingredient_usage(user)
+    if usage:
+        ingredients.sort(key=lambda ingredient: -usage.get(ingredient.id, 0))
+    return ingredients
+
+
+def recount_ingredient_usage(ingredients) -> int:
+    counts = RecipeIngredient.objects.filter(
+        ingredient=OuterRef('pk')
+    ).order_by().values('ingredient').annotate(
+        total=Count('id')
+    ).values('total')
+    return ingredients.update(usage_count=Coalesce(Subquery(counts), 0))
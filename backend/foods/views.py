@@ -1,10 +1,17 @@
 from datetime import datetime as dt
+from decimal import Decimal
 from http import HTTPStatus
 
-from django.http import HttpResponse
+from django.db import transaction
+from django.http import (
+    FileResponse, Http404, HttpResponse, StreamingHttpResponse
+)
 from django_filters.rest_framework import DjangoFilterBackend
-from django.contrib.postgres.search import SearchVector, TrigramSimilarity
-from django.db.models import Sum
+from django.conf import settings
+from django.db.models import (
+    DecimalField, ExpressionWrapper, F, OuterRef, Subquery, Sum, Value
+)
+from django.db.models.functions import Coalesce
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.filters import SearchFilter
 from rest_framework.decorators import action
@@ -12,13 +19,33 @@ from rest_framework.response import Response
 from rest_framework import permissions
 
 from api import serializers as api_serializers
+from api.documents import render_recipes, schedule_refresh
+from api.rendering import (
+    DATABASE, json_response, paginated_json_response, render_recipes_json,
+    rendering_mode
+)
+from api.sync import InvalidCursor, decode_cursor, stream_changes
 from api.pagination import CustomPagination
+from foodgram.timeouts import statement_timeout
+from jobs.models import Job
+from users.tasks import schedule_notifications
 from . import models as foods_models
+from .deletion import delete_recipes
+from .exports import cookbook_path, export_status, favorites_version
 from .filters import RecipeFilter, IngredientFilter
+from .ingest import ingest as ingest_recipes
+from .usage import INGREDIENT_RANKING, rank_for_user
 from .permissions import IsAuthorOrPersonal
+from .tasks import schedule_cookbook_export
+
+
+def format_amount(value) -> str:
+    amount = Decimal(value).quantize(Decimal('0.01')).normalize()
+    return f'{amount:f}'
 
 
 class TagViewSet(ModelViewSet):
+    replica_reads = True
     queryset = foods_models.Tag.objects.all()
     serializer_class = api_serializers.TagSerializer
     pagination_class = None
@@ -27,6 +54,7 @@ class TagViewSet(ModelViewSet):
 
 
 class IngredientViewSet(ModelViewSet):
+    replica_reads = True
     serializer_class = api_serializers.IngredientSerializer
     pagination_class = None
     http_method_names = ['get']
@@ -36,25 +64,18 @@ class IngredientViewSet(ModelViewSet):
     search_fields = ['^name', 'name']
 
     def get_queryset(self):
-        queryset = foods_models.Ingredient.objects.all()
-        query_attr = self.request.GET.get('name')
-        if query_attr:
-            query_attr = query_attr.lower()
-            vector = SearchVector('name')
-            vector_trgm = TrigramSimilarity(
-                'name', query_attr, raw=True, fields=('name')
-            )
-            return queryset.annotate(
-                search=vector
-            ).order_by('name').filter(
-                search=query_attr
-            ) or queryset.annotate(
-                similarity=vector_trgm
-            ).filter(similarity__gt=0.3).order_by('name')
-        return queryset
+        # ``?name`` is searched by IngredientFilter.
+        return foods_models.Ingredient.objects.order_by(*INGREDIENT_RANKING)
+
+    def list(self, request, *args, **kwargs):
+        ingredients = rank_for_user(
+            self.filter_queryset(self.get_queryset()), request.user
+        )
+        return Response(self.get_serializer(ingredients, many=True).data)
 
 
 class RecipeViewSet(ModelViewSet):
+    replica_reads = True
     queryset = foods_models.Recipe.objects.all()
     pagination_class = CustomPagination
     lookup_field = 'id'
@@ -64,55 +85,84 @@ class RecipeViewSet(ModelViewSet):
     filterset_class = RecipeFilter
 
     def get_serializer_class(self):
-        if self.request.method == permissions.SAFE_METHODS:
+        if self.request.method in permissions.SAFE_METHODS:
             return api_serializers.RecipeSerializer
         return api_serializers.CreateRecipeSerializer
 
-    @action(
-        detail=True,
-        lookup_field='id',
-        methods=['post', 'delete'],
-        permission_classes=[IsAuthorOrPersonal]
-    )
-    def favorite(self, request, id):
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset.values_list('id', flat=True))
+        if rendering_mode(request) == DATABASE:
+            return paginated_json_response(
+                self.paginator, render_recipes_json(page, request)
+            )
+        return self.get_paginated_response(render_recipes(page, request))
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            recipe_id = int(self.kwargs[self.lookup_field])
+        except ValueError:
+            raise Http404
+        if rendering_mode(request) == DATABASE:
+            recipes = render_recipes_json([recipe_id], request)
+            if not recipes:
+                raise Http404
+            return json_response(recipes[0])
+        recipes = render_recipes([recipe_id], request)
+        if not recipes:
+            raise Http404
+        return Response(recipes[0])
+
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            serializer.save()
+            schedule_refresh([serializer.instance.id])
+            schedule_notifications(serializer.instance.id)
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            serializer.save()
+            schedule_refresh([serializer.instance.id])
+
+    def perform_destroy(self, instance):
+        delete_recipes(foods_models.Recipe.objects.filter(pk=instance.pk))
+
+    def _toggle_relation(self, request, id, model, **values):
         if request.method == 'POST':
-            try:
-                recipe = foods_models.Recipe.objects.get(id=id)
-            except foods_models.Recipe.DoesNotExist:
+            recipe = foods_models.Recipe.objects.filter(id=id).first()
+            if recipe is None:
                 return Response(
                     data={'errors': 'Not existing recipe'},
                     status=HTTPStatus.BAD_REQUEST
                 )
-            if recipe.favorite_recipes.filter(
-                author=request.user
-            ).exists():
+            if not model.objects.add(request.user, recipe.id, **values):
                 return Response(
                     data={'errors': 'Recipe has already added!'},
                     status=HTTPStatus.BAD_REQUEST
                 )
-            foods_models.Favorite.objects.create(
-                author=request.user, recipe=recipe
-            )
             serializer = api_serializers.RecipeShortSerializer(recipe)
             return Response(serializer.data, status=HTTPStatus.CREATED)
-        try:
-            recipe = foods_models.Recipe.objects.get(id=id)
-        except foods_models.Recipe.DoesNotExist:
+        if model.objects.discard(request.user, id):
+            return Response(status=HTTPStatus.NO_CONTENT)
+        if not foods_models.Recipe.objects.filter(id=id).exists():
             return Response(
                 data={'errors': 'Not existing recipe'},
                 status=HTTPStatus.NOT_FOUND
             )
-        instc = recipe.favorite_recipes.filter(
-            author=request.user
-        )
-        if instc.exists():
-            instc.delete()
-            return Response(status=HTTPStatus.NO_CONTENT)
         return Response(
             data={'errors': 'Recipe has already deleted!'},
             status=HTTPStatus.BAD_REQUEST
         )
 
+    @action(
+        detail=True,
+        lookup_field='id',
+        methods=['post', 'delete'],
+        permission_classes=[IsAuthorOrPersonal]
+    )
+    def favorite(self, request, id):
+        return self._toggle_relation(request, id, foods_models.Favorite)
+
     @action(
         detail=True,
         lookup_field='id',
@@ -120,68 +170,150 @@ class RecipeViewSet(ModelViewSet):
         permission_classes=[IsAuthorOrPersonal]
     )
     def shopping_cart(self, request, id):
-        if request.method == 'POST':
+        values = {}
+        if request.method == 'POST' and 'servings' in request.GET:
             try:
-                recipe = foods_models.Recipe.objects.get(id=id)
-            except foods_models.Recipe.DoesNotExist:
-                return Response(
-                    data={'errors': 'Not existing recipe'},
-                    status=HTTPStatus.BAD_REQUEST
-                )
-            if recipe.shopping_list_recipes.filter(
-                author=request.user
-            ).exists():
+                values['servings'] = int(request.GET['servings'])
+            except ValueError:
+                values['servings'] = 0
+            if not (settings.CONSTANTS.get('MIN_SERVINGS')
+                    <= values['servings']
+                    <= settings.CONSTANTS.get('MAX_SERVINGS')):
                 return Response(
-                    data={'errors': 'Recipe has already added!'},
+                    data={'errors': 'Servings should be from '
+                          f'{settings.CONSTANTS.get("MIN_SERVINGS")} to '
+                          f'{settings.CONSTANTS.get("MAX_SERVINGS")}'},
                     status=HTTPStatus.BAD_REQUEST
                 )
-            foods_models.ShoppingList.objects.create(
-                author=request.user, recipe=recipe
+        return self._toggle_relation(
+            request, id, foods_models.ShoppingList, **values
+        )
+
+    @action(
+        detail=False,
+        methods=['post'],
+        permission_classes=[permissions.IsAdminUser]
+    )
+    def ingest(self, request):
+        # Read line by line instead of request.body so large dumps are
+        # neither held in memory nor capped by DATA_UPLOAD_MAX_MEMORY_SIZE.
+        stream = request.stream
+        if stream is None:
+            return Response(
+                data={'errors': 'Send recipes as NDJSON in the body'},
+                status=HTTPStatus.BAD_REQUEST
             )
-            serializer = api_serializers.RecipeShortSerializer(recipe)
-            return Response(serializer.data, status=HTTPStatus.CREATED)
+        rows = list(ingest_recipes(request.user, iter(stream.readline, b'')))
+        created = sum(row['status'] == 'created' for row in rows)
+        return Response(
+            data={
+                'created': created,
+                'failed': len(rows) - created,
+                'rows': rows,
+            },
+            status=HTTPStatus.CREATED if created else HTTPStatus.BAD_REQUEST
+        )
+
+    @action(detail=False)
+    def changes(self, request):
+        since = request.GET.get('since')
         try:
-            recipe = foods_models.Recipe.objects.get(id=id)
-        except foods_models.Recipe.DoesNotExist:
+            since = decode_cursor(since) if since else None
+            limit = int(request.GET.get('limit', settings.SYNC_PAGE_SIZE))
+        except (InvalidCursor, ValueError):
             return Response(
-                data={'errors': 'Not existing recipe'},
-                status=HTTPStatus.NOT_FOUND
+                data={'errors': 'Invalid since cursor or limit'},
+                status=HTTPStatus.BAD_REQUEST
             )
-        instc = recipe.shopping_list_recipes.filter(
-            author=request.user
+        limit = max(1, min(limit, settings.SYNC_MAX_PAGE_SIZE))
+        return StreamingHttpResponse(
+            stream_changes(since, limit, request),
+            content_type='application/x-ndjson'
         )
-        if instc.exists():
-            instc.delete()
-            return Response(status=HTTPStatus.NO_CONTENT)
+
+    @action(
+        detail=False,
+        methods=['get', 'post'],
+        permission_classes=[permissions.IsAuthenticated]
+    )
+    def cookbook(self, request):
+        """Export favorites as a PDF: POST starts a job, GET polls it.
+
+        GET answers 202 while the job is queued or running and returns
+        the file once it is ready.
+        """
+        user = request.user
+        version = favorites_version(user)
+        if not version:
+            return Response(
+                data={'errors': 'No favorite recipes to export'},
+                status=HTTPStatus.BAD_REQUEST
+            )
+        state = export_status(user.id, version)
+        if state == 'ready':
+            if request.method == 'POST':
+                return Response({'status': state}, status=HTTPStatus.OK)
+            return FileResponse(
+                open(cookbook_path(user.id, version), 'rb'),
+                as_attachment=True, filename=f'{user.username}_cookbook.pdf'
+            )
+        if request.method == 'POST' and state not in {
+            Job.Status.QUEUED, Job.Status.RUNNING
+        }:
+            schedule_cookbook_export(user.id, version)
+            state = Job.Status.QUEUED
+        if state in {Job.Status.QUEUED, Job.Status.RUNNING}:
+            return Response(
+                {'status': state}, status=HTTPStatus.ACCEPTED,
+                headers={'Retry-After': '2'}
+            )
+        if state == Job.Status.FAILED:
+            return Response(
+                {'status': state}, status=HTTPStatus.INTERNAL_SERVER_ERROR
+            )
         return Response(
-            data={'errors': 'Recipe has already deleted!'},
-            status=HTTPStatus.BAD_REQUEST
+            data={'errors': 'No export requested, POST to start one'},
+            status=HTTPStatus.NOT_FOUND
         )
 
     @action(
         detail=False,
         permission_classes=[permissions.IsAuthenticated]
     )
+    @statement_timeout(3000)
     def download_shopping_cart(self, request):
         user = request.user
-        if not user.shopping_list_owners.exists():
-            return Response(status=HTTPStatus.BAD_REQUEST)
-        ingredients = foods_models.RecipeIngredient.objects.filter(
-            recipe__shopping_list_recipes__author=request.user
+        units = foods_models.MeasurementUnit.objects.filter(
+            name=OuterRef('ingredient__measurement_unit')
+        )[:1]
+        ingredients = list(foods_models.RecipeIngredient.objects.filter(
+            recipe__shopping_list_recipes__author=user
+        ).annotate(
+            unit=Coalesce(
+                Subquery(units.values('canonical')),
+                F('ingredient__measurement_unit')
+            ),
+            scaled_amount=ExpressionWrapper(
+                F('amount')
+                * F('recipe__shopping_list_recipes__servings')
+                * Coalesce(Subquery(units.values('factor')), Value(1)),
+                output_field=DecimalField()
+            )
         ).values(
-            'ingredient__name',
-            'ingredient__measurement_unit'
+            'ingredient__name', 'unit'
         ).annotate(
-            amount=Sum('amount')
-        )
+            total=Sum('scaled_amount')
+        ).order_by('ingredient__name', 'unit'))
+        if not ingredients:
+            return Response(status=HTTPStatus.BAD_REQUEST)
         today = dt.today()
         shopping_list = (
             f'Date: {today:%Y-%m-%d}\n\n'
         )
         shopping_list += '\n'.join([
             f'| {unit.get("ingredient__name")} '
-            f'| ({unit.get("ingredient__measurement_unit")}) '
-            f'| {unit.get("amount")}'
+            f'| ({unit.get("unit")}) '
+            f'| {format_amount(unit.get("total"))}'
             for unit in ingredients
         ])
         shopping_list += f'\n\nFoodgram Inc Corporation ({today:%Y})'
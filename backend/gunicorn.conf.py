@@ -0,0 +1,52 @@
+import logging
+import multiprocessing
+import os
+from time import perf_counter
+
+from django.conf import settings
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'foodgram.settings')
+logger = logging.getLogger('gunicorn.error')
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+# Workers do not see each other's per-process cache entries, so more
+# than one needs a shared cache backend (see LOCAL_CACHE_BACKENDS).
+workers = int(os.getenv(
+    'GUNICORN_WORKERS',
+    multiprocessing.cpu_count() * 2 + 1 if settings.SHARED_CACHE else 1
+))
+if workers > 1 and not settings.SHARED_CACHE:
+    raise RuntimeError(
+        f'{workers} workers need a shared cache, set CACHE_BACKEND '
+        'or GUNICORN_WORKERS=1'
+    )
+threads = int(os.getenv('GUNICORN_THREADS', 2))
+worker_class = 'gthread' if threads > 1 else 'sync'
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 200))
+
+# Every worker thread holds at most one database connection, so the
+# total has to fit into the connections Postgres allows for this service.
+db_max_connections = int(os.getenv('DB_MAX_CONNECTIONS', 90))
+
+
+def on_starting(server):
+    needed = workers * threads
+    if needed > db_max_connections:
+        logger.warning(
+            '%s workers x %s threads need up to %s database connections, '
+            'DB_MAX_CONNECTIONS is %s',
+            workers, threads, needed, db_max_connections
+        )
+
+
+def post_fork(server, worker):
+    worker.booted_at = perf_counter()
+
+
+def post_worker_init(worker):
+    from foodgram.warmup import warm_up
+
+    warm_up(booted_at=worker.booted_at)
@@ -0,0 +1,14 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        'id', 'name', 'status', 'priority',
+        'attempts', 'run_after', 'locked_by',
+    )
+    list_filter = ('status',)
+    search_fields = ('name', 'dedup_key')
+    show_full_result_count = False
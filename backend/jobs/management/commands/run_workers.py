@@ -0,0 +1,82 @@
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+from time import monotonic
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs import worker
+
+
+def _work_in_process(worker_id, poll_interval, once):
+    stop = multiprocessing.Event()
+    signal.signal(signal.SIGTERM, lambda *args: stop.set())
+    signal.signal(signal.SIGINT, lambda *args: stop.set())
+    worker.work(worker_id, stop, poll_interval, once)
+
+
+class Command(BaseCommand):
+    help = 'Run background job workers from the database queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int, default=settings.JOB_CONCURRENCY
+        )
+        parser.add_argument(
+            '--processes', action='store_true',
+            help='Use a process per worker instead of threads'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=settings.JOB_POLL_INTERVAL
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Exit once the queue is drained'
+        )
+
+    def handle(self, *args, **options):
+        concurrency = options['concurrency']
+        poll_interval, once = options['poll_interval'], options['once']
+        prefix = f'{socket.gethostname()}:{os.getpid()}'
+        stop = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *args: stop.set())
+        signal.signal(signal.SIGINT, lambda *args: stop.set())
+        worker.requeue_stale()
+        if options['processes']:
+            connections.close_all()
+            units = [
+                multiprocessing.Process(
+                    target=_work_in_process,
+                    args=(f'{prefix}:{number}', poll_interval, once)
+                ) for number in range(concurrency)
+            ]
+        else:
+            units = [
+                threading.Thread(
+                    target=worker.work,
+                    args=(f'{prefix}:{number}', stop, poll_interval, once)
+                ) for number in range(concurrency)
+            ]
+        for unit in units:
+            unit.start()
+        self.stdout.write(
+            f'Started {concurrency} '
+            f'{"process" if options["processes"] else "thread"} worker(s)'
+        )
+        housekeeping_at = monotonic()
+        while any(unit.is_alive() for unit in units):
+            if stop.wait(1):
+                break
+            if monotonic() - housekeeping_at > settings.JOB_LOCK_TIMEOUT:
+                worker.requeue_stale()
+                worker.purge_finished()
+                housekeeping_at = monotonic()
+        for unit in units:
+            if isinstance(unit, multiprocessing.Process):
+                unit.terminate()
+            unit.join()
+        self.stdout.write(self.style.SUCCESS('Workers stopped'))
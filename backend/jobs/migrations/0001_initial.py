@@ -0,0 +1,42 @@
+# Generated by Django 5.0.4 on 2026-10-19 10:18
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=150, verbose_name='Task name')),
+                ('payload', models.JSONField(default=dict, verbose_name='Task arguments')),
+                ('priority', models.SmallIntegerField(default=0, verbose_name='Priority (higher runs first)')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=16, verbose_name='Status')),
+                ('dedup_key', models.CharField(blank=True, max_length=255, null=True, verbose_name='Only one queued job per key')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Attempts made')),
+                ('max_attempts', models.PositiveSmallIntegerField(default=3, verbose_name='Attempts allowed')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Not before')),
+                ('locked_by', models.CharField(blank=True, max_length=64, verbose_name='Worker')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='Claimed at')),
+                ('last_error', models.TextField(blank=True, verbose_name='Last error')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-priority', 'run_after', 'id'],
+                'indexes': [models.Index(fields=['status', '-priority', 'run_after', 'id'], name='job_claim_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='job',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'queued')), fields=('dedup_key',), name='unique queued job'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.4 on 2026-10-19 11:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['dedup_key', '-id'], name='job_dedup_key_idx'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    class Status(models.TextChoices):
+        QUEUED = 'queued', 'Queued'
+        RUNNING = 'running', 'Running'
+        DONE = 'done', 'Done'
+        FAILED = 'failed', 'Failed'
+
+    name = models.CharField(max_length=150, verbose_name='Task name')
+    payload = models.JSONField(default=dict, verbose_name='Task arguments')
+    priority = models.SmallIntegerField(
+        default=0, verbose_name='Priority (higher runs first)'
+    )
+    status = models.CharField(
+        max_length=16, choices=Status.choices, default=Status.QUEUED,
+        verbose_name='Status'
+    )
+    dedup_key = models.CharField(
+        max_length=255, null=True, blank=True,
+        verbose_name='Only one queued job per key'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0, verbose_name='Attempts made'
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        default=3, verbose_name='Attempts allowed'
+    )
+    run_after = models.DateTimeField(
+        default=timezone.now, verbose_name='Not before'
+    )
+    locked_by = models.CharField(
+        max_length=64, blank=True, verbose_name='Worker'
+    )
+    locked_at = models.DateTimeField(
+        null=True, blank=True, verbose_name='Claimed at'
+    )
+    last_error = models.TextField(blank=True, verbose_name='Last error')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-priority', 'run_after', 'id']
+        indexes = [
+            models.Index(
+                fields=['status', '-priority', 'run_after', 'id'],
+                name='job_claim_idx'
+            ),
+            # Status lookups by key (cookbook exports) also see jobs that
+            # are no longer queued, which the unique constraint skips.
+            models.Index(
+                fields=['dedup_key', '-id'], name='job_dedup_key_idx'
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['dedup_key'],
+                condition=models.Q(status='queued'),
+                name='unique queued job'
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.name} |-| {self.status} |-| {self.attempts}'
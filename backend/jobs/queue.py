@@ -0,0 +1,44 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .models import Job
+
+_tasks: dict = {}
+
+
+def task(name=None, max_attempts=3):
+    """Register a function so it can be enqueued by name.
+
+    Tasks receive the job payload as keyword arguments and live in a
+    ``tasks`` module of an installed app.
+    """
+    def register(func):
+        func.task_name = name or f'{func.__module__}.{func.__name__}'
+        func.max_attempts = max_attempts
+        _tasks[func.task_name] = func
+        return func
+    return register
+
+
+def get_task(name):
+    return _tasks[name]
+
+
+def enqueue(func_or_name, payload=None, *, priority=0,
+            dedup_key=None, delay=0) -> None:
+    """Queue a task; a no-op while a queued job has the same dedup_key.
+
+    The row is written in the caller's transaction, so workers only see
+    the job once the data it refers to is committed.
+    """
+    func = (get_task(func_or_name) if isinstance(func_or_name, str)
+            else func_or_name)
+    Job.objects.bulk_create([Job(
+        name=func.task_name,
+        payload=payload or {},
+        priority=priority,
+        dedup_key=dedup_key,
+        max_attempts=func.max_attempts,
+        run_after=timezone.now() + timedelta(seconds=delay),
+    )], ignore_conflicts=True)
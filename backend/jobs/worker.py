@@ -0,0 +1,119 @@
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+from .queue import get_task
+
+logger = logging.getLogger(__name__)
+
+
+def claim(worker_id: str):
+    """Lock the next runnable job for ``worker_id`` or return None.
+
+    ``SELECT ... FOR UPDATE SKIP LOCKED`` keeps workers from waiting on
+    each other; the conditional update also makes claiming safe on
+    backends without row locks.
+    """
+    with transaction.atomic():
+        job = Job.objects.select_for_update(skip_locked=True).filter(
+            status=Job.Status.QUEUED, run_after__lte=timezone.now()
+        ).order_by('-priority', 'run_after', 'id').first()
+        if job is None:
+            return None
+        claimed = Job.objects.filter(
+            id=job.id, status=Job.Status.QUEUED
+        ).update(
+            status=Job.Status.RUNNING, locked_by=worker_id,
+            locked_at=timezone.now(), attempts=F('attempts') + 1,
+            updated_at=timezone.now()
+        )
+    if not claimed:
+        return None
+    job.refresh_from_db()
+    return job
+
+
+def _finish(job, **fields) -> None:
+    fields['updated_at'] = timezone.now()
+    try:
+        with transaction.atomic():
+            Job.objects.filter(id=job.id).update(**fields)
+    except IntegrityError:
+        # A newer job with the same dedup_key is already queued.
+        Job.objects.filter(id=job.id).update(
+            status=Job.Status.DONE, updated_at=fields['updated_at'],
+            last_error='Superseded by a newer queued job'
+        )
+
+
+def run(job) -> bool:
+    try:
+        get_task(job.name)(**job.payload)
+    except Exception:
+        error = traceback.format_exc()
+        logger.warning('Job %s (%s) failed', job.id, job.name)
+        if job.attempts < job.max_attempts:
+            delay = settings.JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+            _finish(
+                job, status=Job.Status.QUEUED, last_error=error,
+                locked_by='', locked_at=None,
+                run_after=timezone.now() + timedelta(seconds=delay)
+            )
+        else:
+            _finish(job, status=Job.Status.FAILED, last_error=error)
+        return False
+    _finish(job, status=Job.Status.DONE, last_error='')
+    return True
+
+
+def requeue_stale() -> int:
+    """Give jobs of crashed workers back to the queue.
+
+    Jobs that used up their attempts fail instead, so a job crashing
+    its worker is not retried forever.
+    """
+    stale = timezone.now() - timedelta(seconds=settings.JOB_LOCK_TIMEOUT)
+    requeued = 0
+    for job in Job.objects.filter(
+        status=Job.Status.RUNNING, locked_at__lt=stale
+    ):
+        if job.attempts >= job.max_attempts:
+            _finish(
+                job, status=Job.Status.FAILED,
+                last_error='Worker lost the job on the last attempt'
+            )
+            continue
+        _finish(job, status=Job.Status.QUEUED, locked_by='', locked_at=None)
+        requeued += 1
+    return requeued
+
+
+def purge_finished() -> int:
+    border = timezone.now() - timedelta(seconds=settings.JOB_RETENTION)
+    deleted, _ = Job.objects.filter(
+        status=Job.Status.DONE, updated_at__lt=border
+    ).delete()
+    return deleted
+
+
+def work(worker_id: str, stop, poll_interval: float, once=False) -> int:
+    """Run jobs until ``stop`` is set (or the queue is empty if once)."""
+    processed = 0
+    while not stop.is_set():
+        job = claim(worker_id)
+        if job is None:
+            close_old_connections()
+            if once:
+                break
+            stop.wait(poll_interval)
+            continue
+        run(job)
+        close_old_connections()
+        processed += 1
+    return processed
@@ -1,7 +1,9 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 
-from .models import CustomUser, Follow
+from foodgram.paginators import EstimatedCountPaginator
+from foods.deletion import delete_users
+from .models import CustomUser, Follow, FollowSuggestion, Notification
 
 
 @admin.register(CustomUser)
@@ -13,9 +15,43 @@ class CustomUserAdmin(UserAdmin):
         'first_name',
         'last_name',
     )
-    list_filter = ('email', 'first_name')
+    list_filter = ('is_staff', 'is_superuser')
+    search_fields = ('^username', '^email')
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+
+    def delete_model(self, request, obj):
+        delete_users(CustomUser.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        delete_users(queryset)
 
 
 @admin.register(Follow)
 class FollowsAdmin(admin.ModelAdmin):
     list_display = ('user', 'author',)
+    list_select_related = ('user', 'author')
+    raw_id_fields = ('user', 'author')
+    search_fields = ('user__username', 'author__username')
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+
+
+@admin.register(FollowSuggestion)
+class FollowSuggestionAdmin(admin.ModelAdmin):
+    list_display = ('user', 'author', 'mutual_follows', 'score')
+    list_select_related = ('user', 'author')
+    raw_id_fields = ('user', 'author')
+    search_fields = ('user__username',)
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ('user', 'recipe', 'is_read', 'created_at')
+    list_select_related = ('user', 'recipe')
+    raw_id_fields = ('user', 'recipe')
+    search_fields = ('user__username',)
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
@@ -0,0 +1,32 @@
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Follow
+
+FOLLOWING_KEY = 'users:following:{}'
+FOLLOWING_TIMEOUT = 60 * 60
+
+
+def followed_author_ids(user) -> frozenset:
+    if not user.is_authenticated:
+        return frozenset()
+    key = FOLLOWING_KEY.format(user.pk)
+    author_ids = cache.get(key) if settings.SHARED_CACHE else None
+    if author_ids is None:
+        author_ids = frozenset(
+            Follow.objects.filter(user=user).values_list(
+                'author_id', flat=True
+            )
+        )
+        if settings.SHARED_CACHE:
+            cache.set(key, author_ids, FOLLOWING_TIMEOUT)
+    return author_ids
+
+
+def invalidate_followed_author_ids(user_id) -> None:
+    transaction.on_commit(
+        partial(cache.delete, FOLLOWING_KEY.format(user_id))
+    )
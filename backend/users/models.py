@@ -6,8 +6,27 @@ from django.contrib.auth.models import (
 )
 from django.core.validators import RegexValidator
 
+from foodgram.db import delete_link, insert_link
 
-class CustomAccountManager(BaseUserManager):
+
+class CustomUserQuerySet(models.QuerySet):
+    def with_is_subscribed(self, user):
+        if not user.is_authenticated:
+            return self.annotate(
+                is_subscribed=models.Value(False)
+            )
+        return self.annotate(
+            is_subscribed=models.Exists(
+                Follow.objects.filter(
+                    user=user, author=models.OuterRef('pk')
+                )
+            )
+        )
+
+
+class CustomAccountManager(
+    BaseUserManager.from_queryset(CustomUserQuerySet)
+):
     def create_user(
             self, email, username,
             first_name, last_name,
@@ -72,6 +91,17 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
         return self.username
 
 
+class FollowQuerySet(models.QuerySet):
+    def add(self, user, author_id) -> bool:
+        return insert_link(
+            self.model, 'user', user.id, 'author', author_id,
+            exclude_owner=True
+        )
+
+    def discard(self, user, author_id) -> bool:
+        return delete_link(self.model, 'user', user.id, 'author', author_id)
+
+
 class Follow(models.Model):
     user = models.ForeignKey(
         CustomUser,
@@ -86,6 +116,8 @@ class Follow(models.Model):
         on_delete=models.CASCADE,
     )
 
+    objects = FollowQuerySet.as_manager()
+
     class Meta:
         ordering = ['-id']
         constraints = [
@@ -94,6 +126,85 @@ class Follow(models.Model):
                 name='unique following'
             )
         ]
+        indexes = [
+            # Followers of an author in id order, for notification fan-out.
+            models.Index(fields=['author', 'user'], name='follow_author_idx')
+        ]
 
     def __str__(self) -> str:
         return f'{self.user.username} - {self.author.username}'
+
+
+class FollowSuggestion(models.Model):
+    user = models.ForeignKey(
+        CustomUser,
+        related_name='follow_suggestions',
+        verbose_name='User',
+        on_delete=models.CASCADE,
+    )
+    author = models.ForeignKey(
+        CustomUser,
+        related_name='+',
+        verbose_name='Suggested author',
+        on_delete=models.CASCADE,
+    )
+    mutual_follows = models.PositiveIntegerField(
+        verbose_name='Followed by authors the user follows'
+    )
+    score = models.FloatField(verbose_name='Score')
+
+    class Meta:
+        ordering = ['user', '-score']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'author'],
+                name='unique follow suggestion'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-score', 'author'],
+                name='follow_suggestion_rank_idx'
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.user_id} -> {self.author_id} ({self.score:.2f})'
+
+
+class Notification(models.Model):
+    user = models.ForeignKey(
+        CustomUser,
+        related_name='notifications',
+        verbose_name='Recipient',
+        on_delete=models.CASCADE,
+    )
+    recipe = models.ForeignKey(
+        'foods.Recipe',
+        related_name='+',
+        verbose_name='Published recipe',
+        on_delete=models.CASCADE,
+    )
+    is_read = models.BooleanField(
+        default=False, db_default=False, verbose_name='Read'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True, verbose_name='Created at'
+    )
+
+    class Meta:
+        ordering = ['-id']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'recipe'],
+                name='unique notification'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-id'], name='notification_inbox_idx'
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.user_id} <- {self.recipe_id}'
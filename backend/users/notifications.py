@@ -0,0 +1,32 @@
+from django.conf import settings
+
+from foods.models import Recipe
+from .models import Follow, Notification
+
+
+def fan_out(recipe_id, after=0):
+    """Notify the followers of a recipe's author with ids above ``after``.
+
+    Handles at most ``NOTIFICATION_FAN_OUT_BATCH`` followers, walking
+    ``follow_author_idx`` in user id order. Returns the last follower
+    notified when more may follow, otherwise None.
+    """
+    author_id = Recipe.objects.filter(id=recipe_id).values_list(
+        'author_id', flat=True
+    ).first()
+    if author_id is None:
+        return None
+    batch = settings.NOTIFICATION_FAN_OUT_BATCH
+    follower_ids = list(Follow.objects.filter(
+        author_id=author_id, user_id__gt=after
+    ).order_by('user_id').values_list('user_id', flat=True)[:batch])
+    # Conflicts are notifications a failed attempt already inserted.
+    Notification.objects.bulk_create(
+        [
+            Notification(user_id=user_id, recipe_id=recipe_id)
+            for user_id in follower_ids
+        ],
+        batch_size=settings.NOTIFICATION_INSERT_BATCH,
+        ignore_conflicts=True
+    )
+    return follower_ids[-1] if len(follower_ids) == batch else None
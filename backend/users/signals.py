@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .following import invalidate_followed_author_ids
+from .models import Follow
+from .tasks import schedule_suggestions_refresh
+
+
+@receiver([post_save, post_delete], sender=Follow)
+def invalidate_following(sender, instance, **kwargs):
+    invalidate_followed_author_ids(instance.user_id)
+    schedule_suggestions_refresh(instance.user_id)
@@ -0,0 +1,74 @@
+from collections import Counter, defaultdict
+from math import log1p
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+
+from foods.models import Favorite
+from .models import Follow, FollowSuggestion
+
+
+def _edges(user_ids) -> dict:
+    following = defaultdict(set)
+    for user_id, author_id in Follow.objects.filter(
+        user_id__in=user_ids
+    ).order_by().values_list('user_id', 'author_id'):
+        following[user_id].add(author_id)
+    return following
+
+
+def _popularity(author_ids) -> dict:
+    return dict(Favorite.objects.filter(
+        recipe__author_id__in=author_ids
+    ).order_by().values('recipe__author_id').annotate(
+        total=Count('id')
+    ).values_list('recipe__author_id', 'total'))
+
+
+def compute_suggestions(user_ids) -> dict:
+    """Rank authors two follows away from each user.
+
+    Each candidate scores one point per followed author who follows it,
+    plus ``SUGGESTION_POPULARITY_WEIGHT * log(1 + favorites)`` of its
+    recipes. Authors the user already follows are skipped.
+    """
+    following = _edges(user_ids)
+    second_hop = _edges(set().union(*following.values()))
+    mutual: dict = {}
+    for user_id, followed in following.items():
+        counts = Counter()
+        for author_id in followed:
+            counts.update(second_hop.get(author_id, ()))
+        for author_id in followed | {user_id}:
+            counts.pop(author_id, None)
+        mutual[user_id] = counts
+    favorites = _popularity(set().union(*mutual.values()))
+    weight = settings.SUGGESTION_POPULARITY_WEIGHT
+    ranked = {}
+    for user_id, counts in mutual.items():
+        scored = sorted((
+            (count + weight * log1p(favorites.get(author_id, 0)),
+             author_id, count)
+            for author_id, count in counts.items()
+        ), key=lambda row: (-row[0], row[1]))
+        ranked[user_id] = scored[:settings.SUGGESTION_LIMIT]
+    return ranked
+
+
+def refresh_suggestions(user_ids) -> int:
+    """Replace the stored suggestions of ``user_ids``; return rows written."""
+    user_ids = list(user_ids)
+    ranked = compute_suggestions(user_ids)
+    rows = [
+        FollowSuggestion(
+            user_id=user_id, author_id=author_id,
+            mutual_follows=count, score=score
+        )
+        for user_id, scored in ranked.items()
+        for score, author_id, count in scored
+    ]
+    with transaction.atomic():
+        FollowSuggestion.objects.filter(user_id__in=user_ids).delete()
+        FollowSuggestion.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
@@ -0,0 +1,63 @@
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+
+from jobs.queue import enqueue, task
+from .models import Follow
+from .notifications import fan_out
+from .suggestions import refresh_suggestions
+
+FOLLOWER_BATCH_SIZE = 500
+
+
+@task()
+def refresh_follow_suggestions(user_ids):
+    refresh_suggestions(user_ids)
+
+
+@task()
+def refresh_follower_suggestions(user_id):
+    """Refresh everyone whose second hop runs through ``user_id``."""
+    follower_ids = iter(list(Follow.objects.filter(
+        author_id=user_id
+    ).order_by('user_id').values_list('user_id', flat=True)))
+    while batch := list(islice(follower_ids, FOLLOWER_BATCH_SIZE)):
+        refresh_suggestions(batch)
+
+
+def schedule_suggestions_refresh(user_id) -> None:
+    """Recompute the suggestions a follow change of ``user_id`` affects.
+
+    The lists of the user and of their followers, who reach authors
+    through the user, are refreshed once the follows settle.
+    """
+    enqueue(
+        refresh_follow_suggestions, {'user_ids': [user_id]},
+        dedup_key=f'suggestions:{user_id}',
+        delay=settings.SUGGESTION_REFRESH_DELAY
+    )
+    enqueue(
+        refresh_follower_suggestions, {'user_id': user_id},
+        dedup_key=f'suggestions:followers:{user_id}',
+        delay=settings.SUGGESTION_REFRESH_DELAY
+    )
+
+
+@task()
+def notify_followers(recipe_id, after=0):
+    with transaction.atomic():
+        last = fan_out(recipe_id, after)
+        if last is not None:
+            enqueue(
+                notify_followers, {'recipe_id': recipe_id, 'after': last},
+                dedup_key=f'notifications:{recipe_id}:{last}'
+            )
+
+
+def schedule_notifications(recipe_id) -> None:
+    """Tell the author's followers about a new recipe in the background."""
+    enqueue(
+        notify_followers, {'recipe_id': recipe_id},
+        dedup_key=f'notifications:{recipe_id}:0'
+    )
@@ -1,32 +1,39 @@
 from http import HTTPStatus
 
+from django.conf import settings
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import get_user_model
+from django.db.models import Count, Exists, OuterRef, Prefetch, Value
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from djoser import utils as djoser_utils
 from djoser import views as djoser_views
 
-from api.pagination import CustomPagination
+from api.pagination import CustomPagination, NotificationPagination
 from api.serializers import (
     UserRetrieveListSerializer,
     CustomUserCreateSerializer,
-    FollowingSerializer
+    FollowingSerializer,
+    NotificationSerializer,
+    SuggestedAuthorSerializer
 )
-from users.models import Follow
+from foods.deletion import delete_users
+from foods.models import Recipe
+from users.following import invalidate_followed_author_ids
+from users.models import Follow, FollowSuggestion, Notification
+from users.tasks import schedule_suggestions_refresh
 
 User = get_user_model()
 
 
 class CustomRetrieveListUserViewSet(djoser_views.UserViewSet):
+    replica_reads = True
     lookup_field = 'id'
     pagination_class = CustomPagination
 
     def get_queryset(self):
-        if (self.request.path.endswith('subscriptions/')
-                or self.request.path.endswith('subscribe/')):
-            return Follow.objects.all()
-        return User.objects.all()
+        return User.objects.with_is_subscribed(self.request.user)
 
     def get_permissions(self):
         if self.action in {'list', 'retrieve'}:
@@ -34,12 +41,21 @@ class CustomRetrieveListUserViewSet(djoser_views.UserViewSet):
         return super().get_permissions()
 
     def get_serializer_class(self):
+        if self.action == 'destroy' or (
+            self.action == 'me' and self.request.method == 'DELETE'
+        ):
+            return super().get_serializer_class()
         if self.action in {'list', 'retrieve', 'me'}:
             return UserRetrieveListSerializer
-        if self.request.path.endswith('set_password/'):
+        if self.action == 'set_password':
             return super().get_serializer_class()
         return CustomUserCreateSerializer
 
+    def perform_destroy(self, instance):
+        if instance == self.request.user:
+            djoser_utils.logout_user(self.request)
+        delete_users(User.objects.filter(pk=instance.pk))
+
     @action(
         detail=False,
         methods=['get'],
@@ -47,13 +63,94 @@ class CustomRetrieveListUserViewSet(djoser_views.UserViewSet):
         serializer_class=FollowingSerializer,
     )
     def subscriptions(self, request):
-        queryset = User.objects.filter(subscribing__user=self.request.user)
+        recipes_limit = FollowingSerializer.recipes_limit(request)
+        queryset = User.objects.filter(
+            subscribing__user=self.request.user
+        ).annotate(
+            recipes_count=Count('recipes'), is_subscribed=Value(True)
+        ).prefetch_related(Prefetch(
+            'recipes', queryset=Recipe.objects.all()[:recipes_limit],
+            to_attr='limited_recipes'
+        )).order_by('-id')
         queryset = self.paginate_queryset(queryset)
         serializer = FollowingSerializer(
-            queryset, many=True, context={'request': request}
+            queryset, many=True,
+            context={'request': request, 'recipes_limit': recipes_limit}
         )
         return self.get_paginated_response(serializer.data)
 
+    @action(
+        detail=False,
+        methods=['get'],
+        permission_classes=[IsAuthenticated],
+        serializer_class=SuggestedAuthorSerializer,
+        pagination_class=None,
+    )
+    def suggestions(self, request):
+        limit = request.query_params.get('limit', '')
+        limit = min(
+            int(limit) if limit.isdigit() else settings.SUGGESTION_LIMIT,
+            settings.SUGGESTION_LIMIT
+        )
+        authors = []
+        for suggestion in FollowSuggestion.objects.filter(
+            user=request.user
+        ).select_related('author').annotate(is_subscribed=Exists(
+            Follow.objects.filter(user=request.user, author=OuterRef('author'))
+        )).order_by('-score', 'author')[:limit]:
+            suggestion.author.mutual_follows = suggestion.mutual_follows
+            suggestion.author.is_subscribed = suggestion.is_subscribed
+            authors.append(suggestion.author)
+        serializer = SuggestedAuthorSerializer(
+            authors, many=True, context={'request': request}
+        )
+        return Response(serializer.data)
+
+    @action(
+        detail=False,
+        methods=['get'],
+        permission_classes=[IsAuthenticated],
+        serializer_class=NotificationSerializer,
+        pagination_class=NotificationPagination,
+    )
+    def notifications(self, request):
+        queryset = Notification.objects.filter(
+            user=request.user
+        ).select_related('recipe__author').annotate(
+            recipe_author_subscribed=Exists(Follow.objects.filter(
+                user=request.user, author=OuterRef('recipe__author')
+            ))
+        )
+        if request.query_params.get('unread'):
+            queryset = queryset.filter(is_read=False)
+        page = self.paginate_queryset(queryset)
+        for notification in page:
+            notification.recipe.author.is_subscribed = (
+                notification.recipe_author_subscribed
+            )
+        serializer = NotificationSerializer(
+            page, many=True, context={'request': request}
+        )
+        return self.get_paginated_response(serializer.data)
+
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='notifications/read',
+        permission_classes=[IsAuthenticated],
+    )
+    def read_notifications(self, request):
+        """Mark notifications read, up to ``?before`` (an id) if given."""
+        queryset = Notification.objects.filter(
+            user=request.user, is_read=False
+        )
+        before = request.query_params.get('before', '')
+        if before.isdigit():
+            queryset = queryset.filter(id__lte=int(before))
+        return Response(
+            {'read': queryset.update(is_read=True)}, status=HTTPStatus.OK
+        )
+
     @action(
         detail=True,
         lookup_field='id',
@@ -63,21 +160,27 @@ class CustomRetrieveListUserViewSet(djoser_views.UserViewSet):
     )
     def subscribe(self, request, id=None):
         user = request.user
-        author = get_object_or_404(User, id=self.kwargs.get('id'))
         if request.method == 'POST':
+            recipes_limit = FollowingSerializer.recipes_limit(request)
+            author = get_object_or_404(
+                User.objects.annotate(recipes_count=Count('recipes')),
+                id=self.kwargs.get('id')
+            )
             serializer = FollowingSerializer(
-                author, data=request.data, context={'request': request}
+                author, data=request.data,
+                context={'request': request, 'recipes_limit': recipes_limit}
             )
             serializer.is_valid(raise_exception=True)
-            Follow.objects.create(user=user, author=author)
+            serializer.save()
             return Response(serializer.data, status=HTTPStatus.CREATED)
 
         elif request.method == 'DELETE':
-            follow_instance = author.subscribing.filter(user=user)
-            if not follow_instance.exists():
-                return Response(
-                    data={'errors': 'Not existing subscription'},
-                    status=HTTPStatus.BAD_REQUEST
-                )
-            follow_instance.first().delete()
-            return Response(status=HTTPStatus.NO_CONTENT)
+            if Follow.objects.discard(user, self.kwargs.get('id')):
+                invalidate_followed_author_ids(user.id)
+                schedule_suggestions_refresh(user.id)
+                return Response(status=HTTPStatus.NO_CONTENT)
+            get_object_or_404(User, id=self.kwargs.get('id'))
+            return Response(
+                data={'errors': 'Not existing subscription'},
+                status=HTTPStatus.BAD_REQUEST
+            )